@@ -2,14 +2,21 @@ from django.contrib import admin
 
 # Register your models here.
 from .models import Category, Location, Post
+from .search import filter_posts
 
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
-    list_display = ["title", "author", "category", "pub_date", "location"]
-    search_fields = ["title", "author", "category", "pub_date", "location"]
+    list_display = ["title", "author", "category", "pub_date", "location",
+                    "comment_count"]
+    search_fields = ["title", "text"]
     list_filter = ["title", "author", "category", "pub_date", "location"]
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return filter_posts(queryset, search_term), False
+
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
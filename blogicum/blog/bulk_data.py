@@ -0,0 +1,248 @@
+"""Потоковая загрузка и выгрузка данных блога в формате фикстур Django.
+
+Поддерживаются JSON-массив, как у ``dumpdata``, и NDJSON — по объекту
+на строку. Файл читается по частям, в памяти держится одна пачка
+объектов, поэтому размер файла ограничен только диском.
+"""
+import json
+import re
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.color import no_style
+from django.core.serializers import python
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+JSON = 'json'
+NDJSON = 'ndjson'
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl')
+
+# Команды, которые пересобирают то, что при обычном сохранении
+# поддерживают сигналы.
+REBUILD_COMMANDS = (
+    'recount_comments',
+    'recount_user_stats',
+    'rebuild_search_index',
+    'rebuild_timeline',
+)
+
+CHUNK_SIZE = 64 * 1024
+# Самая длинная незавершённая лексема в конце буфера — ``\uXXX``.
+TOKEN_TAIL = 6
+WHITESPACE_RE = re.compile(r'\s*')
+
+
+def data_models():
+    """Модели в порядке зависимостей: сначала те, на кого ссылаются."""
+    return [
+        get_user_model(),
+        *(apps.get_model('blog', name)
+          for name in ('Category', 'Location', 'Post', 'Comment')),
+    ]
+
+
+def format_for(path):
+    return NDJSON if str(path).endswith(NDJSON_SUFFIXES) else JSON
+
+
+class JSONArrayReader:
+    """Итератор по элементам JSON-массива, читающий поток по частям."""
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        # Сколько символов потока уже отброшено из начала буфера.
+        self.offset = 0
+
+    def _fill(self):
+        # Буфер под длинный объект растёт вдвое, а не на кусок: иначе
+        # объект разбирается заново после каждого куска.
+        size = max(self.chunk_size, len(self.buffer) - self.pos)
+        chunk = self.stream.read(size)
+        if not chunk:
+            raise ValueError('JSON-массив оборвался до закрывающей скобки.')
+        self.offset += self.pos
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+
+    def _truncated(self, error):
+        """Ошибка вызвана концом буфера, а не самим JSON."""
+        return (
+            error.msg.startswith('Unterminated string')
+            or error.pos >= len(self.buffer) - TOKEN_TAIL
+        )
+
+    def _next_char(self):
+        while True:
+            self.pos = WHITESPACE_RE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            self._fill()
+
+    def _decode(self):
+        self._next_char()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as error:
+                if not self._truncated(error):
+                    raise ValueError(
+                        f'Некорректный JSON в символе '
+                        f'{self.offset + error.pos}: {error.msg}.'
+                    ) from error
+                # Объект не поместился в буфер целиком: дочитываем.
+                self._fill()
+            else:
+                self.offset += end
+                self.buffer, self.pos = self.buffer[end:], 0
+                return value
+
+    def __iter__(self):
+        if self._next_char() != '[':
+            raise ValueError('Ожидался JSON-массив объектов.')
+        self.pos += 1
+        if self._next_char() == ']':
+            return
+        while True:
+            yield self._decode()
+            char = self._next_char()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f'Неожиданный символ {char!r} в массиве.')
+
+
+def read_records(path):
+    with open(path, encoding='utf-8') as stream:
+        if format_for(path) == NDJSON:
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from JSONArrayReader(stream)
+
+
+@contextmanager
+def preserved_timestamps(model):
+    """Отключает ``auto_now`` и ``auto_now_add``: даты берутся из файла."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield fields
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _insert(model, batch, timestamps, ignore_conflicts):
+    now = timezone.now()
+    for item in batch:
+        # В старых выгрузках нет полей, добавленных позже, например
+        # updated_at.
+        for field in timestamps:
+            if getattr(item.object, field.attname) is None:
+                setattr(item.object, field.attname, now)
+    with transaction.atomic():
+        model.objects.bulk_create(
+            [item.object for item in batch],
+            ignore_conflicts=ignore_conflicts,
+        )
+        for item in batch:
+            for name, values in (item.m2m_data or {}).items():
+                if values:
+                    getattr(item.object, name).set(values)
+
+
+def load_model(path, model, batch_size, ignore_conflicts=False):
+    """Вставляет объекты ``model`` из файла пачками; возвращает их число.
+
+    ``bulk_create`` не шлёт сигналов моделей, поэтому производные
+    данные после загрузки пересобираются отдельно.
+    """
+    label = model._meta.label_lower
+    total = 0
+    batch = []
+    with preserved_timestamps(model) as timestamps:
+        for record in read_records(path):
+            if record.get('model') != label:
+                continue
+            batch.extend(
+                python.Deserializer([record], ignorenonexistent=True)
+            )
+            if len(batch) >= batch_size:
+                _insert(model, batch, timestamps, ignore_conflicts)
+                total += len(batch)
+                batch = []
+        if batch:
+            _insert(model, batch, timestamps, ignore_conflicts)
+            total += len(batch)
+    return total
+
+
+def reset_sequences(models):
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+def rebuild_derived_data(batch_size, stdout=None):
+    """Счётчики, статистика, поиск и лента после массовой вставки."""
+    from .cache import invalidate, scopes_for_posts
+    from .models import Post
+
+    for name in REBUILD_COMMANDS:
+        call_command(name, batch_size=batch_size, stdout=stdout)
+    invalidate(scopes_for_posts(Post.objects.all()))
+
+
+def iter_records(model, batch_size):
+    """Объекты ``model`` в формате фикстур, пачками по первичному ключу."""
+    last_pk = None
+    queryset = model._default_manager.order_by('pk')
+    while True:
+        page = queryset
+        if last_pk is not None:
+            page = page.filter(pk__gt=last_pk)
+        batch = list(page[:batch_size])
+        if not batch:
+            return
+        last_pk = batch[-1].pk
+        yield from python.Serializer().serialize(batch)
+
+
+def write_records(stream, records, output_format):
+    """Пишет записи в поток; возвращает их число."""
+    total = 0
+    if output_format == NDJSON:
+        for record in records:
+            stream.write(
+                json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False)
+                + '\n'
+            )
+            total += 1
+        return total
+    stream.write('[')
+    for record in records:
+        stream.write(',\n' if total else '\n')
+        stream.write(
+            json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False)
+        )
+        total += 1
+    stream.write('\n]\n')
+    return total
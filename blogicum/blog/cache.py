@@ -0,0 +1,192 @@
+import hashlib
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from blogicum.middleware import incr_metric
+from blogicum.replicas import reading_from_replica
+
+from .scheduler import seconds_until_next_publication
+
+GENERATION_KEY = 'blog:feed:gen:{}'
+PAGE_KEY = 'blog:feed:page:{}:{}:{}'
+VERSION_KEY = 'blog:version:{}:{}'
+POST_CARD_KEY = 'blog:card:{}:{}'
+
+INDEX = ('index',)
+
+# Версия имён всех пользователей: имена комментаторов на странице поста
+# не стоят того, чтобы хранить версию на каждого.
+USERNAMES = ('user', 'names')
+
+
+def index_scope():
+    return INDEX
+
+
+def category_scope(category_slug):
+    return ('category', category_slug)
+
+
+def profile_scope(username):
+    return ('profile', username)
+
+
+def scope_filter(scope):
+    kind, *args = scope
+    if kind == 'category':
+        return {'category__slug': args[0]}
+    if kind == 'profile':
+        return {'author__username': args[0]}
+    return {}
+
+
+def _generation_key(scope):
+    return GENERATION_KEY.format(':'.join(scope))
+
+
+def get_generation(scope):
+    key = _generation_key(scope)
+    generation = cache.get(key)
+    if generation is None:
+        # Новое случайное поколение вместо «нулевого»: если ключ
+        # поколения вытеснят из кеша, старые страницы не воскреснут.
+        cache.add(key, uuid.uuid4().hex, None)
+        generation = cache.get(key)
+    return generation
+
+
+def invalidate(scopes):
+    cache.set_many(
+        {_generation_key(scope): uuid.uuid4().hex for scope in scopes}, None
+    )
+
+
+def invalidate_on_commit(scopes):
+    # Сбрасываем сразу и ещё раз после коммита: иначе параллельный
+    # запрос успеет закешировать страницу по данным до коммита.
+    scopes = set(scopes)
+    invalidate(scopes)
+    transaction.on_commit(lambda: invalidate(scopes))
+
+
+def _version_key(model_name, pk):
+    return VERSION_KEY.format(model_name, pk)
+
+
+def bump_version(instance):
+    bump_versions([(instance._meta.model_name, instance.pk)])
+
+
+def bump_versions(pairs):
+    cache.set_many(
+        {_version_key(*pair): uuid.uuid4().hex for pair in pairs}, None
+    )
+
+
+def get_versions(pairs):
+    keys = [_version_key(model_name, pk) for model_name, pk in pairs]
+    versions = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def post_card_cache_key(post):
+    versions = get_versions((
+        ('post', post.pk),
+        ('category', post.category_id),
+        ('location', post.location_id),
+        ('user', post.author_id),
+    ))
+    stamp = ':'.join(versions + [str(post.comment_count)])
+    return POST_CARD_KEY.format(
+        post.pk, hashlib.md5(stamp.encode()).hexdigest()
+    )
+
+
+def scopes_for_posts(queryset):
+    scopes = {INDEX}
+    rows = queryset.order_by().values_list(
+        'category__slug', 'author__username'
+    ).distinct()
+    for category_slug, username in rows:
+        if category_slug:
+            scopes.add(category_scope(category_slug))
+        scopes.add(profile_scope(username))
+    return scopes
+
+
+def feed_cache_timeout(scope):
+    return seconds_until_next_publication(
+        settings.FEED_CACHE_TIMEOUT, **scope_filter(scope)
+    )
+
+
+def page_cache_timeout(scope):
+    timeout = feed_cache_timeout(scope)
+    if reading_from_replica():
+        # Сброс поколения уже случился на основной базе, а реплика могла
+        # ещё не получить запись: такая страница под новым поколением
+        # прожила бы весь FEED_CACHE_TIMEOUT.
+        timeout = min(timeout, settings.REPLICA_PIN_SECONDS)
+    return timeout
+
+
+def page_cache_key(scope, request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return PAGE_KEY.format(':'.join(scope), get_generation(scope), path)
+
+
+def cache_feed_page(get_scope):
+    """Кеширует отрендеренную ленту для анонимных пользователей."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (
+                not settings.FEED_CACHE_TIMEOUT
+                or request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated
+            ):
+                return view(request, *args, **kwargs)
+            scope = get_scope(**kwargs)
+            key = page_cache_key(scope, request)
+            cached = cache.get(key)
+            if cached is not None:
+                incr_metric('page_cache_hits')
+                response, expires_at = cached
+                not_modified = get_conditional_response(
+                    request,
+                    etag=response.get('ETag'),
+                    response=response,
+                )
+                if not_modified is not response:
+                    return not_modified
+            else:
+                incr_metric('page_cache_misses')
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200 or response.streaming:
+                    return response
+                if hasattr(response, 'render'):
+                    response.render()
+                timeout = page_cache_timeout(scope)
+                expires_at = time.time() + timeout
+                cache.set(key, (response, expires_at), timeout)
+            # Прокси и браузеры держат страницу не дольше, чем до
+            # ближайшей отложенной публикации в этой ленте.
+            patch_cache_control(
+                response,
+                public=True,
+                max_age=max(int(expires_at - time.time()), 0),
+            )
+            return response
+        return wrapper
+    return decorator
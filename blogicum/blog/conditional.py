@@ -0,0 +1,81 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from blogicum.replicas import reading_from_replica
+
+from .cache import (USERNAMES, category_scope, get_generation, get_versions,
+                    index_scope, profile_scope, scope_filter)
+from .models import Post
+from .scheduler import next_publication
+
+
+def feed_state(get_scope):
+    """Состояние ленты: поколение её кеша и ближайшая публикация.
+
+    Поколение сбрасывают все сигналы, которые меняют ленту, — посты,
+    комментарии, категории, места и имена авторов. Отложенный пост
+    выходит без записи в базу, поэтому в состояние входит и дата
+    ближайшей публикации: она сменится, как только пост станет виден.
+    """
+
+    def state(request, **kwargs):
+        scope = get_scope(**kwargs)
+        return {
+            'generation': get_generation(scope),
+            'next_publication': next_publication(**scope_filter(scope)),
+        }
+    return state
+
+
+index_state = feed_state(index_scope)
+category_state = feed_state(category_scope)
+profile_state = feed_state(profile_scope)
+
+
+def post_state(request, post_id):
+    state = Post.objects.filter(pk=post_id).values(
+        'updated_at',
+        'pub_date',
+        'comment_count',
+        'category__is_published',
+        'category__updated_at',
+        'location__updated_at',
+    ).first() or {}
+    # Версия поста меняется и без updated_at — при готовых копиях фото;
+    # версия имён — при смене имени автора или комментатора.
+    state['versions'] = get_versions((('post', post_id), USERNAMES))
+    # Отложенный пост становится виден без изменения строки в базе.
+    pub_date = state.get('pub_date')
+    state['live'] = pub_date is not None and pub_date <= timezone.now()
+    return state
+
+
+def _etag(request, get_state, kwargs):
+    state = get_state(request, **kwargs)
+    # Страница зависит и от того, кто смотрит (шапка, черновики
+    # автора), и от номера страницы или курсора.
+    raw = [sorted(state.items()), request.user.pk, request.get_full_path()]
+    if reading_from_replica():
+        # Состояние берётся с основной базы и из кеша, а страница —
+        # с реплики, которая может отставать: такой ETag живёт не
+        # дольше REPLICA_PIN_SECONDS.
+        raw.append(int(time.time() // settings.REPLICA_PIN_SECONDS))
+    return hashlib.md5(repr(raw).encode()).hexdigest()
+
+
+def conditional_page(get_state):
+    """Валидатор ETag из дешёвого состояния ``get_state``.
+
+    Если ETag совпал с заголовком клиента, ответ 304 уходит без вызова
+    представления и рендеринга шаблона. Last-Modified не отдаётся:
+    удаление поста или скрытие категории не сдвигает время вперёд.
+    """
+
+    def etag(request, *args, **kwargs):
+        return _etag(request, get_state, kwargs)
+
+    return condition(etag_func=etag)
@@ -9,9 +9,19 @@ User = get_user_model()
 
 class PostForm(forms.ModelForm):
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, upload_errors=None, **kwargs):
         super(PostForm, self).__init__(*args, **kwargs)
         self.fields['pub_date'].initial = timezone.now()
+        # Файлы, отсечённые BoundedImageUploadHandler, в self.files не
+        # попадают; без этих ошибок форма молча сохранилась бы без фото.
+        self.upload_errors = upload_errors or {}
+
+    def clean(self):
+        cleaned_data = super().clean()
+        for field, message in self.upload_errors.items():
+            if field in self.fields:
+                self.add_error(field, message)
+        return cleaned_data
 
     class Meta:
         model = Post
@@ -0,0 +1,236 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+from .storage import post_image_storage, release_image_on_commit
+
+logger = logging.getLogger(__name__)
+
+WEBP = 'webp'
+SAVE_OPTIONS = {
+    WEBP: ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'png': ('PNG', {'optimize': True}),
+}
+
+_executor = None
+
+
+def rendition_widths():
+    return sorted({
+        width * density
+        for width in settings.POST_IMAGE_RENDITIONS.values()
+        for density in settings.POST_IMAGE_DENSITIES
+    })
+
+
+def rendition_name(name, width, ext):
+    """Имя копии рядом с оригиналом: ``posts_images/cat.640w.webp``."""
+    root, _ = os.path.splitext(name)
+    return f'{root}.{width}w.{ext}'
+
+
+def _fallback_ext(image):
+    if 'A' in image.getbands() or 'transparency' in image.info:
+        return 'png'
+    return 'jpg'
+
+
+ORIGINAL_OPTIONS = {
+    'JPEG': {'quality': 90, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 90},
+}
+
+
+def clean_image(file):
+    """Удаляет EXIF из фото и ужимает его до POST_IMAGE_MAX_WIDTH.
+
+    Ориентация из EXIF применяется к пикселям до удаления метаданных.
+    Формат не меняется; анимированные картинки не трогаем. Возвращает
+    байты очищенного фото или None, если чистить нечего.
+    """
+    file.seek(0)
+    try:
+        image = Image.open(file)
+    except Image.UnidentifiedImageError:
+        return None
+    image_format = image.format
+    if getattr(image, 'is_animated', False):
+        return None
+    has_exif = bool(image.getexif()) or 'exif' in image.info
+    too_wide = image.width > settings.POST_IMAGE_MAX_WIDTH
+    if not (has_exif or too_wide):
+        return None
+    image = ImageOps.exif_transpose(image)
+    if image.width > settings.POST_IMAGE_MAX_WIDTH:
+        width = settings.POST_IMAGE_MAX_WIDTH
+        image = image.resize(
+            (width, round(image.height * width / image.width)),
+            Image.Resampling.LANCZOS,
+        )
+    image.info.pop('exif', None)
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L', 'CMYK'):
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, image_format, **ORIGINAL_OPTIONS.get(image_format, {}))
+    return buffer.getvalue()
+
+
+def clean_original(name, storage):
+    """Имя очищенного оригинала фото ``name``.
+
+    Файл называется по хешу содержимого и отдаётся с вечным кешем,
+    поэтому очищенные байты сохраняются под новым именем, а не поверх
+    старых. Если чистить нечего, возвращается ``name``.
+    """
+    with storage.open(name) as file:
+        cleaned = clean_image(file)
+    if cleaned is None:
+        return name
+    return storage.save_version(name, ContentFile(cleaned))
+
+
+def build_renditions(name, storage=None):
+    """Чистит оригинал фото ``name`` и строит недостающие копии.
+
+    Возвращает описание для ``Post.image_renditions``; ``source`` — имя
+    очищенного оригинала, ``original`` — исходное. С базой данных не
+    работает, поэтому годится и для потоков, и для дочерних процессов.
+    Копии шире оригинала не строятся.
+    """
+    storage = storage or post_image_storage
+    original, name = name, clean_original(name, storage)
+    with storage.open(name) as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        image.load()
+    fallback = _fallback_ext(image)
+    image = image.convert('RGB' if fallback == 'jpg' else 'RGBA')
+    widths = [width for width in rendition_widths() if width < image.width]
+    for width in widths:
+        resized = None
+        for ext in (WEBP, fallback):
+            target = rendition_name(name, width, ext)
+            if storage.exists(target):
+                continue
+            if resized is None:
+                resized = image.resize(
+                    (width, round(image.height * width / image.width)),
+                    Image.Resampling.LANCZOS,
+                )
+            image_format, options = SAVE_OPTIONS[ext]
+            buffer = BytesIO()
+            resized.save(buffer, image_format, **options)
+            storage.save_derived(target, ContentFile(buffer.getvalue()))
+    return {
+        'source': name,
+        'original': original,
+        'width': image.width,
+        'widths': widths,
+        'fallback': fallback,
+    }
+
+
+def apply_renditions(post_id, renditions):
+    from .cache import bump_version, invalidate_on_commit, scopes_for_posts
+    from .models import Post
+
+    original = renditions.get('original', renditions['source'])
+    # Фото могли заменить, пока строились копии: тогда запись устарела.
+    posts = Post.objects.filter(pk=post_id, image=original)
+    with transaction.atomic():
+        if not posts.update(
+            image=renditions['source'], image_renditions=renditions
+        ):
+            return
+        bump_version(Post(pk=post_id))
+        invalidate_on_commit(scopes_for_posts(
+            Post.objects.filter(pk=post_id)
+        ))
+        if original != renditions['source']:
+            release_image_on_commit(original)
+
+
+def render_post_image(post_id, name):
+    try:
+        apply_renditions(post_id, build_renditions(name))
+    except Exception:
+        logger.exception('Не удалось обработать фото %s поста %s',
+                         name, post_id)
+
+
+def _render_in_background(post_id, name):
+    try:
+        render_post_image(post_id, name)
+    finally:
+        # Соединения с базой у каждого потока свои.
+        connections.close_all()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.POST_IMAGE_WORKERS,
+            thread_name_prefix='post-images',
+        )
+    return _executor
+
+
+def _submit(post_id, name):
+    if not settings.POST_IMAGE_WORKERS:
+        render_post_image(post_id, name)
+    else:
+        _get_executor().submit(_render_in_background, post_id, name)
+
+
+def schedule_renditions(post):
+    """После коммита отдаёт фото поста фоновому потоку, если копий нет.
+
+    При ``POST_IMAGE_WORKERS = 0`` копии строятся сразу, в том же потоке.
+    """
+    if not post.image:
+        return
+    if post.image_renditions.get('source') == post.image.name:
+        return
+    post_id, name = post.pk, post.image.name
+    transaction.on_commit(lambda: _submit(post_id, name))
+
+
+def image_sources(post, kind):
+    """Атрибуты ``<img>`` и ``<source>`` для фото поста в роли ``kind``.
+
+    Пока фоновая обработка не закончилась, отдаётся только оригинал.
+    """
+    sources = {'src': post.image.url}
+    renditions = post.image_renditions
+    if renditions.get('source') != post.image.name:
+        return sources
+    base = settings.POST_IMAGE_RENDITIONS[kind]
+    limit = base * max(settings.POST_IMAGE_DENSITIES)
+    widths = [width for width in renditions['widths'] if width <= limit]
+    if not widths:
+        return sources
+    storage = post.image.storage
+
+    def srcset(ext):
+        return ', '.join(
+            f'{storage.url(rendition_name(post.image.name, width, ext))} '
+            f'{width}w'
+            for width in widths
+        )
+
+    fallback = renditions['fallback']
+    sources.update(
+        src=storage.url(rendition_name(post.image.name, widths[0], fallback)),
+        srcset=srcset(fallback),
+        webp_srcset=srcset(WEBP),
+        sizes=f'(max-width: {base}px) 100vw, {base}px',
+    )
+    return sources
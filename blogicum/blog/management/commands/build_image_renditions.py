@@ -0,0 +1,68 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Q
+
+from blog.images import apply_renditions, build_renditions
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Строит уменьшенные копии фото постов, у которых их нет, '
+            'в нескольких процессах.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Число процессов; по умолчанию — по числу ядер.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Сколько фото отдавать пулу процессов за раз.',
+        )
+
+    def handle(self, *args, workers, batch_size, **options):
+        self.done = self.failed = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            last_id = 0
+            while True:
+                batch = list(
+                    Post.objects.filter(pk__gt=last_id)
+                    .exclude(Q(image='') | Q(image__isnull=True))
+                    .order_by('pk')
+                    .values_list('pk', 'image', 'image_renditions')[
+                        :batch_size
+                    ]
+                )
+                if not batch:
+                    break
+                last_id = batch[-1][0]
+                self.process(pool, [
+                    (pk, image) for pk, image, renditions in batch
+                    if renditions.get('source') != image
+                ])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Обработано фото: {self.done}, с ошибками: {self.failed}'
+            )
+        )
+
+    def process(self, pool, pending):
+        # Пул запускает процессы по мере надобности: открытые соединения
+        # с базой не должны попасть в дочерние процессы.
+        connections.close_all()
+        futures = {
+            pool.submit(build_renditions, image): pk for pk, image in pending
+        }
+        for future in as_completed(futures):
+            try:
+                apply_renditions(futures[future], future.result())
+                self.done += 1
+            except Exception as error:
+                self.failed += 1
+                self.stderr.write(f'Пост {futures[future]}: {error}')
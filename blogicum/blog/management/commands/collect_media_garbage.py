@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.storage import collect_garbage
+
+
+class Command(BaseCommand):
+    help = ('Удаляет фото постов и их копии, на которые не ссылается '
+            'ни один пост.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько файлов проверять одним запросом к базе.',
+        )
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=3600,
+            help='Не трогать файлы моложе стольких секунд.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать, что было бы удалено.',
+        )
+
+    def handle(self, *args, batch_size, min_age, dry_run, **options):
+        field = Post._meta.get_field('image')
+        removed = collect_garbage(
+            field.upload_to.rstrip('/'),
+            batch_size=batch_size,
+            min_age=min_age,
+            dry_run=dry_run,
+        )
+        for name in removed:
+            self.stdout.write(name)
+        verb = 'Будет удалено' if dry_run else 'Удалено'
+        self.stdout.write(
+            self.style.SUCCESS(f'{verb} файлов: {len(removed)}')
+        )
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from blog.bulk_data import (JSON, NDJSON, data_models, format_for,
+                            iter_records, write_records)
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает пользователей, категории, места, посты и '
+        'комментарии в формате, который читает load_blog_data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            help='Файл для выгрузки; по умолчанию — стандартный вывод.',
+        )
+        parser.add_argument(
+            '--format',
+            choices=(JSON, NDJSON),
+            help='По умолчанию выбирается по расширению файла.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько объектов читать из базы за раз.',
+        )
+
+    def handle(self, *args, output, format, batch_size, **options):
+        records = (
+            record
+            for model in data_models()
+            for record in iter_records(model, batch_size)
+        )
+        if output is None:
+            # Как dumpdata: мимо OutputWrapper, который дописывает
+            # перевод строки к каждому фрагменту.
+            total = write_records(self.stdout._out, records, format or JSON)
+        else:
+            with open(output, 'w', encoding='utf-8') as stream:
+                total = write_records(
+                    stream, records, format or format_for(output)
+                )
+        self.stderr.write(f'Выгружено объектов: {total}')
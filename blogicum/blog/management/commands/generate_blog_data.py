@@ -0,0 +1,65 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.bulk_data import rebuild_derived_data
+from blog.synthetic import BlogDataGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетических пользователей, посты и комментарии для '
+        'нагрузочного тестирования. Одинаковый --seed даёт одинаковые '
+        'данные.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in (
+            ('users', 1000),
+            ('categories', 20),
+            ('locations', 50),
+            ('posts', 10_000),
+            ('comments', 50_000),
+        ):
+            parser.add_argument(
+                f'--{name}', type=int, default=default,
+                help=f'Сколько создать, по умолчанию {default}.',
+            )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Сколько объектов вставлять за одну транзакцию.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Процессов, генерирующих тексты; 1 — без пула.',
+        )
+        parser.add_argument(
+            '--skip-rebuild',
+            action='store_true',
+            help='Не пересобирать счётчики, статистику, поиск и ленту.',
+        )
+
+    def handle(self, *args, seed, batch_size, workers, skip_rebuild,
+               **options):
+        start = time.perf_counter()
+        generator = BlogDataGenerator(
+            seed=seed, batch_size=batch_size, workers=workers
+        )
+        created = generator.generate(
+            **{name: options[name] for name in (
+                'users', 'categories', 'locations', 'posts', 'comments'
+            )}
+        )
+        for name, total in created.items():
+            self.stdout.write(f'{name}: {total}')
+        if not skip_rebuild:
+            rebuild_derived_data(batch_size, self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные созданы за {time.perf_counter() - start:.1f} с.'
+        ))
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+
+from blog.bulk_data import (data_models, load_model, rebuild_derived_data,
+                            reset_sequences)
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает пользователей, категории, места, посты и '
+        'комментарии из JSON- или NDJSON-фикстуры через bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл .json, .ndjson или .jsonl.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько объектов вставлять за одну транзакцию.',
+        )
+        parser.add_argument(
+            '--ignore-conflicts',
+            action='store_true',
+            help='Пропускать объекты, чей первичный ключ уже занят.',
+        )
+        parser.add_argument(
+            '--skip-rebuild',
+            action='store_true',
+            help=(
+                'Не пересобирать счётчики, статистику, поиск и ленту: '
+                'например, если следом загружается ещё один файл.'
+            ),
+        )
+
+    def handle(self, *args, path, batch_size, ignore_conflicts,
+               skip_rebuild, **options):
+        # Файл читается по разу на модель, зато в памяти только пачка,
+        # а посты вставляются уже после своих авторов и категорий.
+        models = data_models()
+        for model in models:
+            total = load_model(path, model, batch_size, ignore_conflicts)
+            self.stdout.write(f'{model._meta.label}: {total}')
+        reset_sequences(models)
+        if skip_rebuild:
+            return
+        rebuild_derived_data(batch_size, self.stdout)
+        self.stdout.write(self.style.SUCCESS('Данные загружены.'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import rebuild_index, uses_fts5
+
+
+class Command(BaseCommand):
+    help = 'Переиндексирует посты для полнотекстового поиска пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько постов читать и индексировать за раз.',
+        )
+
+    def handle(self, *args, batch_size, **options):
+        if not uses_fts5():
+            self.stdout.write(
+                'Индекс поиска строится базой данных, пересборка не нужна.'
+            )
+            return
+        total = rebuild_index(batch_size)
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано постов: {total}')
+        )
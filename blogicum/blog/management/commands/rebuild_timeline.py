@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.timeline import rebuild_timeline
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает материализованную ленту главной страницы.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько постов читать и записывать за раз.',
+        )
+
+    def handle(self, *args, batch_size, **options):
+        with transaction.atomic():
+            total = rebuild_timeline(batch_size)
+        self.stdout.write(
+            self.style.SUCCESS(f'Записей в ленте: {total}')
+        )
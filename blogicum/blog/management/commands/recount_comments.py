@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.comment_count пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько постов обновлять за одну транзакцию.',
+        )
+
+    def handle(self, *args, batch_size, **options):
+        updated = 0
+        last_id = 0
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_id)
+                .order_by('pk')
+                .only('pk', 'comment_count')[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].pk
+            counts = dict(
+                Comment.objects.filter(post__in=batch)
+                .values_list('post')
+                .annotate(total=Count('pk'))
+                .order_by()
+            )
+            changed = []
+            for post in batch:
+                total = counts.get(post.pk, 0)
+                if post.comment_count != total:
+                    post.comment_count = total
+                    changed.append(post)
+            with transaction.atomic():
+                Post.objects.bulk_update(changed, ['comment_count'])
+            updated += len(changed)
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено счётчиков: {updated}')
+        )
@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max
+
+from blog.models import Comment, Post, UserStats
+
+User = get_user_model()
+
+FIELDS = ('post_count', 'comment_count', 'last_activity')
+
+
+def _totals(model, batch):
+    return {
+        author: (total, last)
+        for author, total, last in model.objects.filter(author__in=batch)
+        .values_list('author')
+        .annotate(total=Count('pk'), last=Max('created_at'))
+        .order_by()
+    }
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает статистику пользователей (UserStats) пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько пользователей обновлять за одну транзакцию.',
+        )
+
+    def handle(self, *args, batch_size, **options):
+        updated = 0
+        last_id = 0
+        while True:
+            batch = list(
+                User.objects.filter(pk__gt=last_id)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1]
+            posts = _totals(Post, batch)
+            comments = _totals(Comment, batch)
+            existing = UserStats.objects.in_bulk(batch)
+            created, changed = [], []
+            for user_id in batch:
+                post_count, last_post = posts.get(user_id, (0, None))
+                comment_count, last_comment = comments.get(
+                    user_id, (0, None)
+                )
+                values = (
+                    post_count,
+                    comment_count,
+                    max(filter(None, (last_post, last_comment)), default=None),
+                )
+                stats = existing.get(user_id)
+                if stats is None:
+                    created.append(UserStats(
+                        user_id=user_id, **dict(zip(FIELDS, values))
+                    ))
+                elif tuple(getattr(stats, f) for f in FIELDS) != values:
+                    for field, value in zip(FIELDS, values):
+                        setattr(stats, field, value)
+                    changed.append(stats)
+            with transaction.atomic():
+                UserStats.objects.bulk_create(created)
+                UserStats.objects.bulk_update(changed, FIELDS)
+            updated += len(created) + len(changed)
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено записей статистики: {updated}')
+        )
@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from blog.scheduler import PublicationScheduler
+
+
+class Command(BaseCommand):
+    help = (
+        'Публикует отложенные посты: ждёт ближайшую pub_date и сбрасывает '
+        'кеши лент, в которые пост попал.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-sleep',
+            type=float,
+            default=60,
+            help='Не спать дольше стольких секунд между проверками.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Обработать уже наступившие публикации и выйти.',
+        )
+
+    def handle(self, *args, max_sleep, once, **options):
+        scheduler = PublicationScheduler(max_sleep=max_sleep)
+        if once:
+            # При разовом запуске нет прошлой итерации, поэтому берём
+            # окно в max_sleep секунд назад.
+            scheduler.last_run -= timedelta(seconds=max_sleep)
+            for post in scheduler.run_pending():
+                self.stdout.write(f'Опубликован пост {post.pk}')
+            return
+        scheduler.run()
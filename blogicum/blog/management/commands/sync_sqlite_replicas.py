@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from blogicum.replicas import copy_to_sqlite_replica
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файлы реплик из '
+        'DATABASE_REPLICAS для локальной проверки чтения с реплик.'
+    )
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('В DATABASE_REPLICAS нет ни одной реплики.')
+        for alias in settings.DATABASE_REPLICAS:
+            if connections[alias].vendor != 'sqlite':
+                raise CommandError(f'Реплика {alias} — не SQLite.')
+            copy_to_sqlite_replica(alias)
+            self.stdout.write(self.style.SUCCESS(
+                f'Основная база скопирована в {alias}'
+            ))
@@ -0,0 +1,71 @@
+# Generated by Django 3.2.16 on 2026-10-18 18:07
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def _subquery(model, aggregate):
+    return Subquery(
+        model.objects.filter(author=OuterRef('pk'))
+        .order_by()
+        .values('author')
+        .annotate(value=aggregate)
+        .values('value')
+    )
+
+
+def fill_user_stats(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    UserStats = apps.get_model('blog', 'UserStats')
+    users = User.objects.annotate(
+        post_total=Coalesce(_subquery(Post, Count('pk')), 0),
+        comment_total=Coalesce(_subquery(Comment, Count('pk')), 0),
+        last_post=_subquery(Post, Max('created_at')),
+        last_comment=_subquery(Comment, Max('created_at')),
+    ).values_list(
+        'pk', 'post_total', 'comment_total', 'last_post', 'last_comment'
+    )
+    UserStats.objects.bulk_create(
+        (
+            UserStats(
+                user_id=pk,
+                post_count=post_total,
+                comment_count=comment_total,
+                last_activity=max(
+                    filter(None, (last_post, last_comment)), default=None
+                ),
+            )
+            for pk, post_total, comment_total, last_post, last_comment
+            in users.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('blog', '0012_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='auth.user', verbose_name='Пользователь')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Публикаций')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Комментариев')),
+                ('last_activity', models.DateTimeField(blank=True, null=True, verbose_name='Последняя активность')),
+            ],
+            options={
+                'verbose_name': 'статистика пользователя',
+                'verbose_name_plural': 'Статистика пользователей',
+            },
+        ),
+        migrations.RunPython(fill_user_stats, migrations.RunPython.noop),
+    ]
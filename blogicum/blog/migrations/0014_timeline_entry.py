@@ -0,0 +1,56 @@
+# Generated by Django 3.2.16 on 2026-10-18 18:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_timeline(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    TimelineEntry = apps.get_model('blog', 'TimelineEntry')
+    rows = Post.objects.values_list(
+        'pk', 'pub_date', 'category', 'is_published',
+        'category__is_published',
+    )
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(
+                post_id=pk,
+                pub_date=pub_date,
+                category_id=category_id,
+                is_published=is_published,
+                category_is_published=bool(category_is_published),
+            )
+            for pk, pub_date, category_id, is_published,
+            category_is_published in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_user_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='timeline_entry', serialize=False, to='blog.post', verbose_name='Публикация')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата и время публикации')),
+                ('is_published', models.BooleanField(verbose_name='Опубликовано')),
+                ('category_is_published', models.BooleanField(verbose_name='Категория опубликована')),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='blog.category', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'запись ленты',
+                'verbose_name_plural': 'Лента главной страницы',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(condition=models.Q(('category_is_published', True), ('is_published', True)), fields=['-pub_date', '-post', 'is_published', 'category_is_published'], name='timeline_visible_idx'),
+        ),
+        migrations.RunPython(fill_timeline, migrations.RunPython.noop),
+    ]
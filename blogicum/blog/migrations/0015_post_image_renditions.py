@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 18:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_timeline_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_renditions',
+            field=models.JSONField(default=dict, editable=False, help_text='Заполняется фоновой обработкой после загрузки фото.', verbose_name='Уменьшенные копии фото'),
+        ),
+    ]
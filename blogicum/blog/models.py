@@ -1,9 +1,10 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import models
-from django.db.models import Count
 from django.utils import timezone
 
+from .storage import post_image_storage
+
 User = get_user_model()
 
 
@@ -19,6 +20,7 @@ class BaseBlogModel(models.Model):
         help_text='Если установить дату и время в будущем — можно делать '
                   'отложенные публикации.',
     )
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
 
     class Meta:
         abstract = True
@@ -67,15 +69,30 @@ class PublishedQuerySet(models.QuerySet):
             category__is_published=True,
         )
 
+    def for_profile(self, author, viewer=None):
+        """Лента профиля: посты автора со всем, что рисует карточка.
+
+        Черновики, отложенные посты и посты из скрытых категорий видит
+        только сам автор.
+        """
+        posts = self.filter(author=author)
+        if viewer != author:
+            posts = posts.filter_posts_for_publication()
+        return posts.count_comments()
+
     def count_comments(self):
         return self.select_related(
             'category', 'location', 'author'
-        ).annotate(comment_count=Count('comments')).order_by('-pub_date')
+        ).order_by('-pub_date')
 
 
 class Post(BaseBlogModel):
     image = models.ImageField(
-        'Фото', blank=True, upload_to='posts_images/', null=True
+        'Фото',
+        blank=True,
+        upload_to='posts_images/',
+        null=True,
+        storage=post_image_storage,
     )
     title = models.CharField('Заголовок', max_length=100)
     text = models.TextField('Текст')
@@ -104,12 +121,53 @@ class Post(BaseBlogModel):
         verbose_name='Категория',
         related_name='posts',
     )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    image_renditions = models.JSONField(
+        'Уменьшенные копии фото',
+        default=dict,
+        editable=False,
+        help_text='Заполняется фоновой обработкой после загрузки фото.',
+    )
 
     objects = PublishedQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        # Ленты сортируются по (-pub_date, -id): id в конце ключа
+        # избавляет курсорную пагинацию от досортировки.
+        indexes = (
+            models.Index(
+                fields=('is_published', '-pub_date'),
+                name='post_published_pub_date_idx',
+            ),
+            models.Index(
+                fields=('category', 'is_published', '-pub_date'),
+                name='post_category_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_pub_date_idx',
+            ),
+            # Частичные индексы только по опубликованным постам. SQLite
+            # не применяет условие `WHERE is_published` к индексу с этим
+            # полем в ключе, а условие частичного индекса — применяет.
+            # Бэкенды без поддержки условных индексов их пропустят.
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_visible_pub_date_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_visible_category_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:100]
@@ -118,6 +176,9 @@ class Post(BaseBlogModel):
 class Comment(BaseBlogModel):
 
     text = models.TextField('Текст')
+    # Правки комментариев отмечаются в Post.updated_at: страница поста
+    # и так валидируется по посту, а лишний столбец здесь не нужен.
+    updated_at = None
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
@@ -135,6 +196,83 @@ class Comment(BaseBlogModel):
         ordering = ('created_at',)
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            # Страница комментариев поста — поиск по курсору
+            # (created_at, id) без сортировки всех комментариев поста.
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_created_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:100]
+
+
+class UserStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name='Пользователь',
+        related_name='stats',
+    )
+    post_count = models.PositiveIntegerField('Публикаций', default=0)
+    comment_count = models.PositiveIntegerField('Комментариев', default=0)
+    last_activity = models.DateTimeField(
+        'Последняя активность', null=True, blank=True
+    )
+
+    class Meta:
+        verbose_name = 'статистика пользователя'
+        verbose_name_plural = 'Статистика пользователей'
+
+    def __str__(self):
+        return str(self.user)
+
+
+class TimelineEntry(models.Model):
+    """Строка материализованной ленты главной страницы.
+
+    Узкая копия полей, по которым ``get_posts`` отбирает и сортирует
+    посты; заполняется сигналами и командой ``rebuild_timeline``.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name='Публикация',
+        related_name='timeline_entry',
+    )
+    pub_date = models.DateTimeField('Дата и время публикации')
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        verbose_name='Категория',
+        related_name='+',
+    )
+    is_published = models.BooleanField('Опубликовано')
+    category_is_published = models.BooleanField('Категория опубликована')
+
+    class Meta:
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'Лента главной страницы'
+        indexes = (
+            # Флаги в конце ключа нужны SQLite, чтобы проверить условие
+            # запроса по самому индексу, не читая строки таблицы.
+            models.Index(
+                fields=(
+                    '-pub_date', '-post', 'is_published',
+                    'category_is_published',
+                ),
+                condition=models.Q(
+                    is_published=True, category_is_published=True
+                ),
+                name='timeline_visible_idx',
+            ),
+        )
+
+    def __str__(self):
+        return str(self.post_id)
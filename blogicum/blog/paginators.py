@@ -0,0 +1,231 @@
+import base64
+import binascii
+import collections.abc
+import datetime
+import json
+from functools import reduce
+from operator import and_, or_
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.urls import reverse
+
+OFFSET = 'offset'
+KEYSET = 'keyset'
+
+COMMENT_ORDERING = ('created_at', 'id')
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorEncoder(DjangoJSONEncoder):
+
+    def default(self, o):
+        # DjangoJSONEncoder обрезает микросекунды, а курсору нужна
+        # точная граница, иначе записи с той же секундой потеряются.
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values):
+    raw = json.dumps(list(values), cls=CursorEncoder).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, length):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor(cursor)
+    if not isinstance(values, list) or len(values) != length:
+        raise InvalidCursor(cursor)
+    return values
+
+
+class KeysetPage(collections.abc.Sequence):
+    is_keyset = True
+
+    def __init__(self, object_list, paginator,
+                 next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<KeysetPage of %s items>' % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+
+class KeysetPaginator:
+    """Пагинация по ключу сортировки вместо OFFSET.
+
+    Курсоры ``after``/``before`` — непрозрачные токены со значениями
+    полей сортировки крайней записи страницы. Последнее поле в
+    ``ordering`` должно быть уникальным, иначе записи с одинаковым
+    ключом будут теряться на границах страниц.
+    """
+
+    keyset = True
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.keys = [
+            (name.lstrip('-'), name.startswith('-')) for name in ordering
+        ]
+
+    def encode_cursor(self, obj):
+        return encode_cursor(getattr(obj, name) for name, _ in self.keys)
+
+    def decode_cursor(self, cursor):
+        values = decode_cursor(cursor, len(self.keys))
+        try:
+            values = [
+                self._to_python(name, value)
+                for (name, _), value in zip(self.keys, values)
+            ]
+        except (ValidationError, TypeError, ValueError):
+            # Курсор приходит из адреса: корректный base64 с JSON ещё не
+            # значит, что в нём значения нужных типов.
+            raise InvalidCursor(cursor)
+        if None in values:
+            raise InvalidCursor(cursor)
+        return values
+
+    def _to_python(self, name, value):
+        opts = self.object_list.model._meta
+        try:
+            field = opts.pk if name == 'pk' else opts.get_field(name)
+        except FieldDoesNotExist:
+            return value
+        return field.to_python(value)
+
+    def _seek(self, values, forward):
+        conditions = []
+        for index, (name, descending) in enumerate(self.keys):
+            lookup = 'lt' if descending == forward else 'gt'
+            equal = [
+                Q(**{key: value})
+                for (key, _), value in zip(self.keys[:index], values)
+            ]
+            strict = Q(**{f'{name}__{lookup}': values[index]})
+            conditions.append(reduce(and_, equal + [strict]))
+        return reduce(or_, conditions)
+
+    def _reversed_ordering(self):
+        return [
+            name if descending else f'-{name}'
+            for name, descending in self.keys
+        ]
+
+    def get_page(self, after=None, before=None):
+        try:
+            if before:
+                return self._page_before(self.decode_cursor(before))
+            if after:
+                return self._page_after(self.decode_cursor(after))
+        except InvalidCursor:
+            pass
+        return self._page_after(None)
+
+    def _page_after(self, values):
+        queryset = self.object_list.order_by(*self.ordering)
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, forward=True))
+        items = list(queryset[:self.per_page + 1])
+        has_next = len(items) > self.per_page
+        items = items[:self.per_page]
+        return KeysetPage(
+            items,
+            self,
+            next_cursor=self.encode_cursor(items[-1]) if has_next else None,
+            previous_cursor=(
+                self.encode_cursor(items[0])
+                if values is not None and items else None
+            ),
+        )
+
+    def _page_before(self, values):
+        queryset = self.object_list.order_by(
+            *self._reversed_ordering()
+        ).filter(self._seek(values, forward=False))
+        items = list(queryset[:self.per_page + 1])
+        has_previous = len(items) > self.per_page
+        items = items[:self.per_page][::-1]
+        return KeysetPage(
+            items,
+            self,
+            next_cursor=self.encode_cursor(items[-1]) if items else None,
+            previous_cursor=(
+                self.encode_cursor(items[0]) if has_previous else None
+            ),
+        )
+
+
+def get_pagination_mode(feed):
+    return settings.FEED_PAGINATION.get(feed, OFFSET)
+
+
+def get_feed_page(request, queryset, feed, per_page=None,
+                  ordering=('-pub_date', '-id')):
+    per_page = per_page or settings.POSTS_PER_PAGE
+    if get_pagination_mode(feed) == KEYSET:
+        return KeysetPaginator(queryset, per_page, ordering).get_page(
+            after=request.GET.get('after'),
+            before=request.GET.get('before'),
+        )
+    return Paginator(queryset, per_page).get_page(request.GET.get('page'))
+
+
+def get_comment_page(request, queryset, per_page=None):
+    """Страница комментариев по курсору (created_at, id)."""
+    return KeysetPaginator(
+        queryset, per_page or settings.COMMENTS_PER_PAGE, COMMENT_ORDERING
+    ).get_page(
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
+
+
+def comment_page_url(comment):
+    """Адрес страницы поста с ``comment`` и якорем ``#comment_<id>``.
+
+    Страницы отсчитываются от первого комментария, как при переходе по
+    «Показать ещё», поэтому ссылка ведёт на ту же страницу, что и
+    навигация, и на ней видны соседние комментарии.
+    """
+    per_page = settings.COMMENTS_PER_PAGE
+    comments = type(comment).objects.filter(post_id=comment.post_id)
+    paginator = KeysetPaginator(comments, per_page, COMMENT_ORDERING)
+    earlier = comments.filter(paginator._seek(
+        [comment.created_at, comment.pk], forward=False
+    )).order_by(*COMMENT_ORDERING)
+    url = reverse('blog:post_detail', args=[comment.post_id])
+    position = earlier.count()
+    if position >= per_page:
+        last_on_previous_page = earlier[position // per_page * per_page - 1]
+        url += f'?after={paginator.encode_cursor(last_on_previous_page)}'
+    return f'{url}#comment_{comment.pk}'
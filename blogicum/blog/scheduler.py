@@ -0,0 +1,71 @@
+import time
+
+from django.db.models import Min
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Post
+
+# Отправляется, когда наступает pub_date отложенного поста.
+post_published = Signal()
+
+
+def next_publication(now=None, **filters):
+    now = now or timezone.now()
+    return Post.objects.filter(
+        is_published=True, pub_date__gt=now, **filters
+    ).aggregate(next_pub_date=Min('pub_date'))['next_pub_date']
+
+
+def seconds_until_next_publication(limit, now=None, **filters):
+    """Сколько секунд выдача с ``filters`` не изменится сама по себе.
+
+    Ответ ограничен ``limit`` и ближайшей отложенной публикацией.
+    """
+    now = now or timezone.now()
+    pub_date = next_publication(now, **filters)
+    if pub_date is None:
+        return limit
+    return min(limit, max(int((pub_date - now).total_seconds()), 1))
+
+
+class PublicationScheduler:
+    """Следит за отложенными постами и объявляет о выходе каждого.
+
+    Часы и сон передаются снаружи, чтобы в тестах гонять цикл
+    на поддельном времени.
+    """
+
+    def __init__(self, clock=timezone.now, sleep=time.sleep, max_sleep=60):
+        self.clock = clock
+        self.sleep = sleep
+        self.max_sleep = max_sleep
+        self.last_run = clock()
+
+    def run_pending(self):
+        now = self.clock()
+        posts = list(
+            Post.objects.filter(
+                is_published=True,
+                pub_date__gt=self.last_run,
+                pub_date__lte=now,
+            ).order_by('pub_date')
+        )
+        for post in posts:
+            post_published.send(sender=Post, post=post)
+        self.last_run = now
+        return posts
+
+    def seconds_until_next(self):
+        now = self.clock()
+        pub_date = next_publication(now)
+        if pub_date is None:
+            return self.max_sleep
+        return min(self.max_sleep, (pub_date - now).total_seconds())
+
+    def run(self, iterations=None):
+        while iterations is None or iterations > 0:
+            self.run_pending()
+            self.sleep(self.seconds_until_next())
+            if iterations is not None:
+                iterations -= 1
@@ -0,0 +1,231 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .paginators import (InvalidCursor, KeysetPage, KeysetPaginator,
+                         decode_cursor, encode_cursor)
+
+FTS_TABLE = 'blog_post_fts'
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+WORD_RE = re.compile(r'\w+')
+
+SQLITE_SEARCH_SQL = f'''
+    SELECT id, rank, snippet FROM (
+        SELECT post.id AS id,
+               bm25({FTS_TABLE}, 10.0, 1.0) AS rank,
+               snippet({FTS_TABLE}, -1, %s, %s, '…', 24) AS snippet
+        FROM {FTS_TABLE}
+        JOIN blog_post post ON post.id = {FTS_TABLE}.rowid
+        JOIN blog_category category ON category.id = post.category_id
+        WHERE {FTS_TABLE} MATCH %s
+          AND post.is_published
+          AND category.is_published
+          AND post.pub_date <= %s
+    )
+    WHERE %s OR rank > %s OR (rank = %s AND id > %s)
+    ORDER BY rank, id
+    LIMIT %s
+'''
+
+
+def uses_fts5():
+    return connection.vendor == 'sqlite'
+
+
+def uses_tsvector():
+    return connection.vendor == 'postgresql'
+
+
+def fts5_query(query):
+    # Каждое слово — отдельная фраза с поиском по префиксу: так в MATCH
+    # не попадут операторы и кавычки FTS5 из пользовательского ввода.
+    return ' '.join(f'"{word}"*' for word in WORD_RE.findall(query))
+
+
+def highlight(snippet):
+    return mark_safe(
+        escape(snippet)
+        .replace(HIGHLIGHT_START, '<mark>')
+        .replace(HIGHLIGHT_END, '</mark>')
+    )
+
+
+def _search_vector():
+    from django.contrib.postgres.search import SearchVector
+
+    return SearchVector('title', 'text', config=settings.SEARCH_CONFIG)
+
+
+def _search_query(query):
+    from django.contrib.postgres.search import SearchQuery
+
+    return SearchQuery(
+        query, config=settings.SEARCH_CONFIG, search_type='websearch'
+    )
+
+
+def filter_posts(queryset, query):
+    """Оставляет в queryset только посты, найденные полнотекстовым поиском."""
+    if not WORD_RE.search(query):
+        return queryset.none()
+    if uses_fts5():
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            (fts5_query(query),),
+        ))
+    if uses_tsvector():
+        return queryset.annotate(search=_search_vector()).filter(
+            search=_search_query(query)
+        )
+    return queryset.filter(title__icontains=query)
+
+
+def search_posts(queryset, query, per_page, after=None):
+    """Страница опубликованных постов, отсортированных по релевантности.
+
+    ``queryset`` должен уже быть отфильтрован по правилам публикации:
+    на SQLite он используется только для загрузки найденных постов.
+    """
+    if not WORD_RE.search(query):
+        return KeysetPage([], None)
+    if uses_fts5():
+        return _search_fts5(queryset, query, per_page, after)
+    if uses_tsvector():
+        return _search_tsvector(queryset, query, per_page, after)
+    posts = list(filter_posts(queryset, query).order_by('-pub_date')[
+        :per_page
+    ])
+    for post in posts:
+        post.snippet = post.text
+    return KeysetPage(posts, None)
+
+
+def _decode_rank_cursor(after):
+    """Ранг и id из курсора; ``(None, None)`` — первая страница.
+
+    Значения уходят прямо в параметры SQL, поэтому курсор с чем-то,
+    кроме числа и целого id, считается битым.
+    """
+    if not after:
+        return None, None
+    try:
+        rank, last_id = decode_cursor(after, 2)
+    except InvalidCursor:
+        return None, None
+    if (
+        isinstance(rank, bool) or not isinstance(rank, (int, float))
+        or isinstance(last_id, bool) or not isinstance(last_id, int)
+    ):
+        return None, None
+    return float(rank), last_id
+
+
+def _search_fts5(queryset, query, per_page, after):
+    rank, last_id = _decode_rank_cursor(after)
+    with connection.cursor() as cursor:
+        cursor.execute(SQLITE_SEARCH_SQL, (
+            HIGHLIGHT_START,
+            HIGHLIGHT_END,
+            fts5_query(query),
+            connection.ops.adapt_datetimefield_value(timezone.now()),
+            rank is None,
+            rank,
+            rank,
+            last_id,
+            per_page + 1,
+        ))
+        rows = cursor.fetchall()
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    posts = queryset.in_bulk([row[0] for row in rows])
+    results = []
+    for post_id, post_rank, snippet in rows:
+        # Пост мог пропасть между запросами — просто пропускаем его.
+        if post_id in posts:
+            post = posts[post_id]
+            post.rank = post_rank
+            post.snippet = highlight(snippet)
+            results.append(post)
+    next_cursor = None
+    if has_next:
+        next_cursor = encode_cursor((rows[-1][1], rows[-1][0]))
+    return KeysetPage(results, None, next_cursor=next_cursor)
+
+
+def _search_tsvector(queryset, query, per_page, after):
+    from django.contrib.postgres.search import SearchHeadline, SearchRank
+
+    search_query = _search_query(query)
+    queryset = filter_posts(queryset, query).annotate(
+        rank=SearchRank(_search_vector(), search_query),
+        snippet_html=SearchHeadline(
+            'text',
+            search_query,
+            config=settings.SEARCH_CONFIG,
+            start_sel=HIGHLIGHT_START,
+            stop_sel=HIGHLIGHT_END,
+        ),
+    )
+    page = KeysetPaginator(
+        queryset, per_page, ordering=('-rank', 'id')
+    ).get_page(after=after)
+    for post in page:
+        post.snippet = highlight(post.snippet_html)
+    return page
+
+
+def index_post(post):
+    if not uses_fts5():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', (post.pk,)
+        )
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            (post.pk, post.title, post.text),
+        )
+
+
+def unindex_post(post_id):
+    if not uses_fts5():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', (post_id,)
+        )
+
+
+def rebuild_index(batch_size):
+    """Переиндексирует все посты пачками; возвращает их число."""
+    from .models import Post
+
+    if not uses_fts5():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    total = 0
+    last_id = 0
+    while True:
+        batch = list(
+            Post.objects.filter(pk__gt=last_id)
+            .order_by('pk')
+            .values_list('pk', 'title', 'text')[:batch_size]
+        )
+        if not batch:
+            return total
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+                'VALUES (%s, %s, %s)',
+                batch,
+            )
+        last_id = batch[-1][0]
+        total += len(batch)
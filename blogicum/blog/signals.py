@@ -0,0 +1,315 @@
+from contextvars import ContextVar
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Greatest
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import (INDEX, USERNAMES, bump_version, bump_versions,
+                    category_scope, invalidate_on_commit, profile_scope,
+                    scopes_for_posts)
+from .images import schedule_renditions
+from .models import Category, Comment, Location, Post, UserStats
+from .scheduler import post_published
+from .search import index_post, unindex_post
+from .storage import release_image_on_commit
+from .timeline import sync_category, sync_post
+
+User = get_user_model()
+
+# Посты, которые сейчас удаляются вместе с комментариями: счётчики и
+# кеш по их комментариям пересчитываются разом, а не на каждый.
+_deleting_posts = ContextVar('deleting_posts', default=frozenset())
+
+
+def _post_is_deleted(comment):
+    return comment.post_id in _deleting_posts.get()
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    # Правка комментария меняет страницу поста, поэтому updated_at
+    # поста обновляется и без изменения счётчика.
+    changes = {'updated_at': timezone.now()}
+    if created:
+        changes['comment_count'] = F('comment_count') + 1
+    Post.objects.filter(pk=instance.post_id).update(**changes)
+
+
+@receiver(pre_delete, sender=Post)
+def uncount_post_comments(sender, instance, **kwargs):
+    """Снимает комментарии удаляемого поста со статистики их авторов.
+
+    Каскад шлёт post_delete на каждый комментарий уже после этого
+    сигнала; получатели комментариев такие посты пропускают. Всё
+    выполняется в транзакции удаления.
+    """
+    _deleting_posts.set(_deleting_posts.get() | {instance.pk})
+    comments = Comment.objects.filter(post=instance.pk).order_by()
+    removed = comments.filter(author=OuterRef('pk')).values(
+        'author'
+    ).annotate(total=Count('pk')).values('total')
+    UserStats.objects.filter(pk__in=comments.values('author')).update(
+        comment_count=Greatest(F('comment_count') - Subquery(removed), 0)
+    )
+    invalidate_on_commit(
+        profile_scope(username)
+        for username in User.objects.filter(
+            comments__post=instance.pk
+        ).values_list('username', flat=True).distinct()
+    )
+
+
+@receiver(post_delete, sender=Post)
+def finish_post_deletion(sender, instance, **kwargs):
+    _deleting_posts.set(_deleting_posts.get() - {instance.pk})
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    if _post_is_deleted(instance):
+        return
+    # Срабатывает и для каскадного удаления, и для массового удаления
+    # из админки: QuerySet.delete() шлёт post_delete на каждый объект,
+    # пока у сигнала есть получатели.
+    Post.objects.filter(
+        pk=instance.post_id, comment_count__gt=0
+    ).update(
+        comment_count=F('comment_count') - 1, updated_at=timezone.now()
+    )
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def remember_post_feeds(sender, instance, raw=False, **kwargs):
+    instance._feed_scopes = set()
+    if instance.pk and not raw:
+        instance._feed_scopes = scopes_for_posts(
+            Post.objects.filter(pk=instance.pk)
+        )
+
+
+@receiver(post_save, sender=Post)
+def purge_post_feeds(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_on_commit(
+        instance._feed_scopes
+        | scopes_for_posts(Post.objects.filter(pk=instance.pk))
+    )
+
+
+@receiver(post_delete, sender=Post)
+def purge_deleted_post_feeds(sender, instance, **kwargs):
+    invalidate_on_commit(getattr(instance, '_feed_scopes', {INDEX}))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment_feeds(sender, instance, raw=False, **kwargs):
+    # Ленты удаляемого поста сбрасывает purge_deleted_post_feeds.
+    if raw or _post_is_deleted(instance):
+        return
+    invalidate_on_commit(
+        scopes_for_posts(Post.objects.filter(pk=instance.post_id))
+    )
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+@receiver(pre_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def remember_related_feeds(sender, instance, raw=False, **kwargs):
+    instance._feed_scopes = set()
+    if instance.pk and not raw:
+        instance._feed_scopes = scopes_for_posts(
+            Post.objects.filter(**{sender._meta.model_name: instance.pk})
+        )
+        if sender is Category:
+            old_slug = Category.objects.filter(pk=instance.pk).values_list(
+                'slug', flat=True
+            ).first()
+            if old_slug:
+                instance._feed_scopes.add(category_scope(old_slug))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def purge_related_feeds(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    scopes = getattr(instance, '_feed_scopes', set()) | {INDEX}
+    if sender is Category:
+        scopes.add(category_scope(instance.slug))
+    invalidate_on_commit(scopes)
+
+
+# Поля пользователя, которые видны в карточках постов и на странице
+# профиля. Сохранение только last_login при входе страниц не меняет.
+USER_PAGE_FIELDS = {'username', 'first_name', 'last_name', 'is_staff'}
+
+
+def _changes_user_pages(update_fields):
+    return update_fields is None or bool(USER_PAGE_FIELDS & update_fields)
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, raw=False, update_fields=None,
+                      **kwargs):
+    instance._old_username = None
+    if instance.pk and not raw and _changes_user_pages(update_fields):
+        instance._old_username = User.objects.filter(
+            pk=instance.pk
+        ).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def purge_user_pages(sender, instance, created, raw=False,
+                     update_fields=None, **kwargs):
+    if raw or created or not _changes_user_pages(update_fields):
+        return
+    scopes = {INDEX, profile_scope(instance.username)}
+    old_username = getattr(instance, '_old_username', None)
+    if old_username and old_username != instance.username:
+        # Карточки постов показывают имя автора и ссылку на профиль,
+        # страница поста — ещё и имена комментаторов.
+        bump_versions([('user', instance.pk), USERNAMES])
+        scopes.add(profile_scope(old_username))
+        scopes |= scopes_for_posts(Post.objects.filter(author=instance))
+    invalidate_on_commit(scopes)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def bump_card_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_version(instance)
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not {'title', 'text'} & set(update_fields):
+        return
+    index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_post(instance.pk)
+
+
+def _stats_field(sender):
+    return 'post_count' if sender is Post else 'comment_count'
+
+
+def _purge_author_profile(comment):
+    # Ленты профиля автора поста сбрасывает purge_comment_feeds, а здесь —
+    # профиль автора комментария со счётчиком. При каскадном удалении
+    # пользователя его строки уже может не быть.
+    username = User.objects.filter(pk=comment.author_id).values_list(
+        'username', flat=True
+    ).first()
+    if username:
+        invalidate_on_commit({profile_scope(username)})
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def count_user_activity(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    field = _stats_field(sender)
+    changes = {
+        field: F(field) + 1,
+        'last_activity': instance.created_at,
+    }
+    stats = UserStats.objects.filter(pk=instance.author_id)
+    if not stats.update(**changes):
+        UserStats.objects.get_or_create(user_id=instance.author_id)
+        stats.update(**changes)
+    if sender is Comment:
+        _purge_author_profile(instance)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def uncount_user_activity(sender, instance, **kwargs):
+    if sender is Comment and _post_is_deleted(instance):
+        return
+    field = _stats_field(sender)
+    UserStats.objects.filter(
+        pk=instance.author_id, **{f'{field}__gt': 0}
+    ).update(**{field: F(field) - 1})
+    if sender is Comment:
+        _purge_author_profile(instance)
+
+
+@receiver(post_save, sender=Post)
+def update_timeline_entry(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync_post(instance)
+
+
+@receiver(post_save, sender=Post)
+def render_image(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_renditions(instance)
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_image(sender, instance, raw=False, **kwargs):
+    instance._old_image = None
+    if not instance.pk or raw:
+        return
+    image, renditions = Post.objects.filter(pk=instance.pk).values_list(
+        'image', 'image_renditions'
+    ).first() or (None, {})
+    instance._old_image = image
+    # Пока экземпляр был в памяти, фоновая обработка могла заменить фото
+    # очищенной версией: старое имя вернуло бы удалённый файл.
+    original = renditions.get('original')
+    if original and original != image and instance.image.name == original:
+        instance.image = image
+        instance.image_renditions = renditions
+
+
+@receiver(post_save, sender=Post)
+def release_replaced_image(sender, instance, raw=False, **kwargs):
+    old_image = getattr(instance, '_old_image', None)
+    if old_image and old_image != instance.image.name:
+        release_image_on_commit(old_image)
+
+
+@receiver(post_delete, sender=Post)
+def release_deleted_image(sender, instance, **kwargs):
+    if instance.image:
+        release_image_on_commit(instance.image.name)
+
+
+@receiver(post_save, sender=Category)
+def update_timeline_category(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync_category(instance)
+
+
+@receiver(pre_delete, sender=Category)
+def hide_timeline_category(sender, instance, **kwargs):
+    # Посты удалённой категории остаются с category=NULL, а get_posts
+    # такие посты не показывает.
+    sync_category(instance, is_published=False)
+
+
+@receiver(post_published)
+def purge_published_post_feeds(sender, post, **kwargs):
+    invalidate_on_commit(scopes_for_posts(Post.objects.filter(pk=post.pk)))
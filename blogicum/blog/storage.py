@@ -0,0 +1,196 @@
+import hashlib
+import os
+import posixpath
+import re
+import time
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.core.files.utils import validate_file_name
+from django.db import transaction
+from django.utils.deconstruct import deconstructible
+
+RENDITION_RE = re.compile(r'^(?P<root>.+)\.\d+w\.\w+$')
+# Одинаковые байты с разным написанием расширения — один файл.
+EXTENSION_ALIASES = {'.jpeg': '.jpg', '.jpe': '.jpg', '.tif': '.tiff'}
+HASHED_NAME_RE = re.compile(
+    r'^(?P<directory>.*?)/?[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.\w+$'
+)
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит файлы под именем из SHA-256 содержимого.
+
+    ``posts_images/photo.jpg`` сохраняется как
+    ``posts_images/ab/cd/abcd….jpg``. Повторная загрузка того же файла не
+    пишет ничего нового и возвращает уже существующее имя, поэтому один
+    файл могут делить несколько постов — удалять его можно, только когда
+    на него не ссылается ни один (см. ``release_image``). Повторное
+    использование обновляет время изменения файла: ``release_image`` не
+    трогает файлы моложе POST_IMAGE_RELEASE_GRACE, пока ссылка на них
+    ещё может быть не закоммичена.
+    """
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        digest = digest.hexdigest()
+        directory = posixpath.dirname(name)
+        ext = posixpath.splitext(name)[1].lower()
+        ext = EXTENSION_ALIASES.get(ext, ext)
+        return posixpath.join(
+            directory, digest[:2], digest[2:4], f'{digest}{ext}'
+        )
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        validate_file_name(name, allow_relative_path=True)
+        if self._touch(name):
+            return name
+        return self._save(name, content)
+
+    def _touch(self, name):
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def save_version(self, name, content):
+        """Сохраняет новую версию файла ``name`` под её собственным хешем.
+
+        Каталог загрузки и расширение берутся из ``name``.
+        """
+        match = HASHED_NAME_RE.match(name)
+        directory = match['directory'] if match else posixpath.dirname(name)
+        return self.save(
+            posixpath.join(directory, posixpath.basename(name)), content
+        )
+
+    def save_derived(self, name, content):
+        """Сохраняет файл под готовым именем, без хеширования.
+
+        Для уменьшенных копий: их имя выводится из имени оригинала, а
+        содержимое однозначно задаётся им же.
+        """
+        validate_file_name(name, allow_relative_path=True)
+        return self._save(name, content)
+
+
+post_image_storage = ContentAddressedStorage()
+
+
+def file_group(name):
+    """Имя оригинала без расширения: общее у оригинала и его копий."""
+    match = RENDITION_RE.match(name)
+    if match:
+        return match['root']
+    return posixpath.splitext(name)[0]
+
+
+def referenced_images(names):
+    from .models import Post
+
+    return set(
+        Post.objects.filter(image__in=names).values_list('image', flat=True)
+    )
+
+
+def group_is_referenced(group):
+    """Ссылается ли пост на любой файл группы, с любым расширением."""
+    from .models import Post
+
+    return Post.objects.filter(image__startswith=f'{group}.').exists()
+
+
+def release_image(name, grace=None):
+    """Удаляет фото и его копии, если на группу больше не ссылаются посты.
+
+    Файлы группы, которые сохраняли или использовали повторно моложе
+    ``grace`` секунд, не удаляются: их пост может быть ещё не закоммичен.
+    Такие файлы потом соберёт ``collect_garbage``.
+    """
+    if not name:
+        return
+    if grace is None:
+        grace = settings.POST_IMAGE_RELEASE_GRACE
+    storage = post_image_storage
+    directory = posixpath.dirname(name)
+    if not storage.exists(directory):
+        return
+    group = file_group(name)
+    names = [
+        posixpath.join(directory, file_name)
+        for file_name in storage.listdir(directory)[1]
+        if file_group(posixpath.join(directory, file_name)) == group
+    ]
+    deadline = time.time() - grace
+    if any(
+        storage.get_modified_time(path).timestamp() > deadline
+        for path in names
+    ):
+        return
+    # Ссылки проверяются последними, прямо перед удалением.
+    if group_is_referenced(group):
+        return
+    for path in names:
+        storage.delete(path)
+
+
+def release_image_on_commit(name):
+    transaction.on_commit(lambda: release_image(name))
+
+
+def _walk(storage, directory):
+    directories, files = storage.listdir(directory)
+    yield directory, files
+    for child in sorted(directories):
+        yield from _walk(storage, posixpath.join(directory, child))
+
+
+def collect_garbage(directory, batch_size=1000, min_age=3600, dry_run=False):
+    """Удаляет фото без ссылок из постов вместе с их копиями.
+
+    Обходит ``directory`` потоково и проверяет ссылки пачками примерно по
+    ``batch_size`` файлов. Файлы моложе ``min_age`` секунд не трогаются:
+    их пост может быть ещё не закоммичен. Возвращает удалённые имена.
+    """
+    storage = post_image_storage
+    if not storage.exists(directory):
+        return []
+    deadline = time.time() - min_age
+    removed = []
+    batch = []
+
+    def flush():
+        originals = {
+            name for name in batch if not RENDITION_RE.match(name)
+        }
+        alive = {
+            file_group(name) for name in referenced_images(originals)
+        }
+        for name in batch:
+            if file_group(name) in alive:
+                continue
+            if storage.get_modified_time(name).timestamp() > deadline:
+                continue
+            if not dry_run:
+                storage.delete(name)
+            removed.append(name)
+        batch.clear()
+
+    for path, files in _walk(storage, directory):
+        batch.extend(posixpath.join(path, name) for name in files)
+        # Пачка режется только между каталогами: оригинал и копии
+        # лежат в одном каталоге и проверяются вместе.
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return removed
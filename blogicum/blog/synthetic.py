@@ -0,0 +1,254 @@
+"""Синтетические данные блога для нагрузочных тестов и бенчмарков.
+
+Распределения похожи на живой блог: авторы и обсуждаемость постов
+подчиняются закону Ципфа, часть категорий скрыта, часть постов — черновики
+или отложены на будущее. Тексты пишет Faker в пуле процессов, а объекты
+вставляются ``bulk_create`` пачками. Всё, включая тексты, выводится из
+одного ``seed``: одинаковые параметры дают одинаковые данные, а даты
+отсчитываются от момента запуска.
+"""
+import random
+from array import array
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from itertools import accumulate
+from multiprocessing import Pool
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
+
+from .bulk_data import preserved_timestamps, reset_sequences
+from .models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+LOCALE = 'ru_RU'
+# Показатель Ципфа: у самого активного автора примерно вдвое больше
+# постов, чем у второго, и в сотни раз больше, чем у сотого.
+ZIPF_EXPONENT = 1.1
+HISTORY = timedelta(days=365)
+SCHEDULE_HORIZON = timedelta(days=30)
+TITLE_LENGTH = 100
+
+
+def zipf_cum_weights(size, exponent=ZIPF_EXPONENT):
+    # Таблица по размеру всех постов: массив double, а не список float.
+    return array('d', accumulate(
+        1 / rank ** exponent for rank in range(1, size + 1)
+    ))
+
+
+def generate_texts(task):
+    """Тексты одной пачки; работает в процессе пула.
+
+    Faker засевается по виду текста и номеру пачки, поэтому результат не
+    зависит от того, какой процесс и в каком порядке взял пачку.
+    """
+    kind, seed, number, count = task
+    fake = Faker(LOCALE)
+    fake.seed_instance(f'{seed}:{kind}:{number}')
+    if kind == 'users':
+        return [(fake.first_name(), fake.last_name()) for _ in range(count)]
+    if kind == 'posts':
+        return [
+            (fake.sentence(nb_words=6)[:TITLE_LENGTH],
+             fake.paragraph(nb_sentences=6))
+            for _ in range(count)
+        ]
+    return [fake.paragraph(nb_sentences=2) for _ in range(count)]
+
+
+def _next_pk(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+class BlogDataGenerator:
+    """Генерирует пользователей, категории, места, посты и комментарии.
+
+    ``scheduled_share``, ``draft_share`` и ``hidden_category_share`` —
+    доли отложенных постов, черновиков и скрытых категорий.
+    """
+
+    def __init__(self, seed=0, batch_size=5000, workers=1,
+                 scheduled_share=0.02, draft_share=0.05,
+                 hidden_category_share=0.1):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.fake = Faker(LOCALE)
+        self.fake.seed_instance(seed)
+        self.batch_size = batch_size
+        self.workers = workers
+        self.scheduled_share = scheduled_share
+        self.draft_share = draft_share
+        self.hidden_category_share = hidden_category_share
+        self.now = timezone.now()
+        self._pool = None
+
+    def _texts(self, kind, total):
+        tasks = [
+            (kind, self.seed, number, min(self.batch_size, total - start))
+            for number, start in enumerate(
+                range(0, total, self.batch_size)
+            )
+        ]
+        if self._pool is None:
+            return map(generate_texts, tasks)
+        return self._pool.imap(generate_texts, tasks)
+
+    def _past(self, span=HISTORY):
+        return self.now - span * self.rng.random()
+
+    def _insert(self, model, objects):
+        with preserved_timestamps(model), transaction.atomic():
+            model.objects.bulk_create(objects, batch_size=self.batch_size)
+
+    def generate(self, users, categories, locations, posts, comments):
+        """Создаёт данные и возвращает число объектов каждой модели."""
+        # С одним процессом тексты пишутся тут же, без пула.
+        pool = Pool(self.workers) if self.workers > 1 else nullcontext()
+        with pool as workers:
+            self._pool = workers
+            try:
+                user_ids = self.create_users(users)
+                category_ids = self.create_categories(categories)
+                location_ids = self.create_locations(locations)
+                commentable = self.create_posts(
+                    posts, user_ids, category_ids, location_ids
+                )
+                self.create_comments(comments, commentable, user_ids)
+            finally:
+                self._pool = None
+        reset_sequences([User, Category, Location, Post, Comment])
+        return {
+            'users': users, 'categories': categories,
+            'locations': locations, 'posts': posts, 'comments': comments,
+        }
+
+    def create_users(self, total):
+        first_pk = _next_pk(User)
+        pk = first_pk
+        for names in self._texts('users', total):
+            batch = []
+            for first_name, last_name in names:
+                batch.append(User(
+                    pk=pk,
+                    username=f'user_{pk}',
+                    password=UNUSABLE_PASSWORD_PREFIX,
+                    first_name=first_name,
+                    last_name=last_name,
+                    date_joined=self._past(),
+                ))
+                pk += 1
+            self._insert(User, batch)
+        user_ids = list(range(first_pk, pk))
+        # Самые активные авторы — не обязательно первые по pk.
+        self.rng.shuffle(user_ids)
+        return user_ids
+
+    def create_categories(self, total):
+        first_pk = _next_pk(Category)
+        categories = [
+            Category(
+                pk=pk,
+                title=self.fake.word().capitalize(),
+                description=self.fake.sentence(),
+                slug=f'category-{pk}',
+                # Первая категория всегда видна, чтобы лента не пустовала.
+                is_published=(
+                    pk == first_pk
+                    or self.rng.random() >= self.hidden_category_share
+                ),
+                created_at=self._past(),
+            )
+            for pk in range(first_pk, first_pk + total)
+        ]
+        for category in categories:
+            category.updated_at = category.created_at
+        self._insert(Category, categories)
+        return [category.pk for category in categories]
+
+    def create_locations(self, total):
+        first_pk = _next_pk(Location)
+        locations = []
+        for pk in range(first_pk, first_pk + total):
+            created_at = self._past()
+            locations.append(Location(
+                pk=pk, name=self.fake.city(),
+                created_at=created_at, updated_at=created_at,
+            ))
+        self._insert(Location, locations)
+        return [location.pk for location in locations]
+
+    def _pub_date(self):
+        if self.rng.random() < self.scheduled_share:
+            return self.now + SCHEDULE_HORIZON * self.rng.random()
+        return self._past()
+
+    def create_posts(self, total, user_ids, category_ids, location_ids):
+        """Возвращает pk и даты постов, которые уже можно комментировать."""
+        authors = zipf_cum_weights(len(user_ids))
+        topics = zipf_cum_weights(len(category_ids))
+        commentable = (array('q'), array('d'))
+        pk = _next_pk(Post)
+        for texts in self._texts('posts', total):
+            batch = []
+            for title, text in texts:
+                pub_date = self._pub_date()
+                created_at = min(pub_date, self.now)
+                is_published = self.rng.random() >= self.draft_share
+                batch.append(Post(
+                    pk=pk,
+                    title=title,
+                    text=text,
+                    pub_date=pub_date,
+                    author_id=self.rng.choices(
+                        user_ids, cum_weights=authors)[0],
+                    category_id=self.rng.choices(
+                        category_ids, cum_weights=topics)[0],
+                    location_id=(
+                        self.rng.choice(location_ids)
+                        if location_ids and self.rng.random() < 0.8
+                        else None
+                    ),
+                    is_published=is_published,
+                    created_at=created_at,
+                    updated_at=created_at,
+                ))
+                if is_published and pub_date <= self.now:
+                    commentable[0].append(pk)
+                    commentable[1].append(pub_date.timestamp())
+                pk += 1
+            self._insert(Post, batch)
+        return commentable
+
+    def create_comments(self, total, commentable, user_ids):
+        post_ids, pub_dates = commentable
+        if not post_ids:
+            return
+        # Обсуждаемость тоже по Ципфу: немногие посты собирают почти все
+        # комментарии, у большинства их нет.
+        order = array('q', range(len(post_ids)))
+        self.rng.shuffle(order)
+        popularity = zipf_cum_weights(len(order))
+        authors = zipf_cum_weights(len(user_ids))
+        now = self.now.timestamp()
+        for texts in self._texts('comments', total):
+            batch = []
+            for text in texts:
+                index = self.rng.choices(order, cum_weights=popularity)[0]
+                published = pub_dates[index]
+                created_at = published + (now - published) * self.rng.random()
+                batch.append(Comment(
+                    text=text,
+                    post_id=post_ids[index],
+                    author_id=self.rng.choices(
+                        user_ids, cum_weights=authors)[0],
+                    created_at=datetime.fromtimestamp(
+                        created_at, tz=timezone.utc
+                    ),
+                ))
+            self._insert(Comment, batch)
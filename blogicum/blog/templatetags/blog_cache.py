@@ -0,0 +1,44 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+
+from blog.cache import post_card_cache_key
+from blogicum.middleware import incr_metric
+
+register = template.Library()
+
+
+class PostCardCacheNode(template.Node):
+
+    def __init__(self, nodelist, post):
+        self.nodelist = nodelist
+        self.post = post
+
+    def render(self, context):
+        key = post_card_cache_key(self.post.resolve(context))
+        fragment = cache.get(key)
+        if fragment is not None:
+            incr_metric('fragment_cache_hits')
+            return fragment
+        incr_metric('fragment_cache_misses')
+        fragment = self.nodelist.render(context)
+        cache.set(key, fragment, settings.POST_CARD_CACHE_TIMEOUT)
+        return fragment
+
+
+@register.tag
+def cache_post_card(parser, token):
+    """Кеширует разметку карточки поста до смены версии поста.
+
+    Использование::
+
+        {% cache_post_card post %} ... {% endcache_post_card %}
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' принимает ровно один аргумент — пост."
+        )
+    nodelist = parser.parse(('endcache_post_card',))
+    parser.delete_first_token()
+    return PostCardCacheNode(nodelist, parser.compile_filter(bits[1]))
@@ -0,0 +1,16 @@
+from django import template
+
+from blog.images import image_sources
+
+register = template.Library()
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, kind):
+    """Фото поста с ``srcset`` из уменьшенных копий.
+
+    Использование::
+
+        {% post_image post 'feed' %}
+    """
+    return {'post': post, **image_sources(post, kind)}
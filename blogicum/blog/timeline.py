@@ -0,0 +1,89 @@
+from django.utils import timezone
+
+from .models import Category, Post, TimelineEntry
+from .paginators import get_feed_page
+
+ORDERING = ('-pub_date', '-post_id')
+
+
+def _entry_values(post):
+    category_is_published = Category.objects.filter(
+        pk=post.category_id
+    ).values_list('is_published', flat=True).first()
+    return {
+        'pub_date': post.pub_date,
+        'category_id': post.category_id,
+        'is_published': post.is_published,
+        'category_is_published': bool(category_is_published),
+    }
+
+
+def sync_post(post):
+    TimelineEntry.objects.update_or_create(
+        post_id=post.pk, defaults=_entry_values(post)
+    )
+
+
+def sync_category(category, is_published=None):
+    if is_published is None:
+        is_published = category.is_published
+    TimelineEntry.objects.filter(category_id=category.pk).update(
+        category_is_published=is_published
+    )
+
+
+def visible_entries():
+    # Те же условия, что в get_posts; pub_date сравнивается при чтении,
+    # поэтому отложенные посты появляются в ленте сами.
+    return TimelineEntry.objects.filter(
+        is_published=True,
+        category_is_published=True,
+        pub_date__lte=timezone.now(),
+    ).only('pub_date').order_by(*ORDERING)
+
+
+def get_timeline_page(request):
+    """Страница главной ленты из TimelineEntry.
+
+    Строки ленты читаются по частичному индексу, а посты страницы
+    загружаются одним запросом ``in_bulk`` со всем, что рисует карточка.
+    """
+    page = get_feed_page(request, visible_entries(), 'index',
+                         ordering=ORDERING)
+    post_ids = [entry.post_id for entry in page.object_list]
+    posts = Post.objects.count_comments().in_bulk(post_ids)
+    page.object_list = [
+        posts[post_id] for post_id in post_ids if post_id in posts
+    ]
+    return page
+
+
+def rebuild_timeline(batch_size):
+    """Пересобирает ленту пачками; возвращает число записей."""
+    TimelineEntry.objects.all().delete()
+    total = 0
+    last_id = 0
+    while True:
+        batch = list(
+            Post.objects.filter(pk__gt=last_id)
+            .order_by('pk')
+            .values_list(
+                'pk', 'pub_date', 'category', 'is_published',
+                'category__is_published',
+            )[:batch_size]
+        )
+        if not batch:
+            return total
+        TimelineEntry.objects.bulk_create(
+            TimelineEntry(
+                post_id=pk,
+                pub_date=pub_date,
+                category_id=category_id,
+                is_published=is_published,
+                category_is_published=bool(category_is_published),
+            )
+            for pk, pub_date, category_id, is_published,
+            category_is_published in batch
+        )
+        last_id = batch[-1][0]
+        total += len(batch)
@@ -0,0 +1,82 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadhandler import (SkipFile,
+                                             TemporaryFileUploadHandler)
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+# Столько байт начала файла хватает Pillow, чтобы прочитать размеры
+# картинки даже за крупным блоком EXIF.
+HEADER_LIMIT = 256 * 1024
+
+
+class BoundedImageUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузку сразу во временный файл и отсекает её на лету.
+
+    Файл больше ``POST_IMAGE_MAX_BYTES`` или картинка с числом пикселей
+    больше ``POST_IMAGE_MAX_PIXELS`` (по заголовку, без декодирования)
+    пропускаются, не дочитываясь до конца. Причина попадает в
+    ``request.upload_errors`` — форма покажет её как ошибку поля.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_bytes = settings.POST_IMAGE_MAX_BYTES
+        self.max_pixels = settings.POST_IMAGE_MAX_PIXELS
+        if request is not None and not hasattr(request, 'upload_errors'):
+            request.upload_errors = {}
+
+    def new_file(self, field_name, file_name, content_type, content_length,
+                 charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length,
+                         charset, content_type_extra)
+        self.header = b''
+        self.check_header = content_type.startswith('image/')
+        if content_length and content_length > self.max_bytes:
+            self.reject(self.size_error())
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.max_bytes:
+            self.reject(self.size_error())
+        if self.check_header:
+            self.header += raw_data
+            self.check_dimensions()
+        return super().receive_data_chunk(raw_data, start)
+
+    def check_dimensions(self):
+        try:
+            with Image.open(BytesIO(self.header)) as image:
+                width, height = image.size
+        except Image.DecompressionBombError:
+            self.reject(self.pixels_error())
+        except Exception:
+            # Заголовок ещё не дочитан или это не картинка: второе
+            # проверит ImageField формы, когда файл загрузится целиком.
+            if len(self.header) >= HEADER_LIMIT:
+                self.check_header = False
+                self.header = b''
+            return
+        self.check_header = False
+        self.header = b''
+        if width * height > self.max_pixels:
+            self.reject(self.pixels_error())
+
+    def reject(self, message):
+        if self.request is not None:
+            self.request.upload_errors[self.field_name] = message
+        # Временный файл удаляется при закрытии.
+        self.file.close()
+        raise SkipFile(message)
+
+    def size_error(self):
+        return (
+            'Файл слишком большой: допустимо не больше '
+            f'{filesizeformat(self.max_bytes)}.'
+        )
+
+    def pixels_error(self):
+        return (
+            'Слишком большое изображение: допустимо не больше '
+            f'{self.max_pixels / 1_000_000:g} Мпикс.'
+        )
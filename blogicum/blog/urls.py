@@ -1,9 +1,9 @@
 from django.urls import path
 
 from .views import (CategoryListView, CommentDeleteView, CommentUpdateView,
-                    PostCreateView, PostDetailView, PostsDeleteView,
-                    PostUpdateView, add_comment, edit_profile, get_profile,
-                    index)
+                    PostCommentsView, PostCreateView, PostDetailView,
+                    PostsDeleteView, PostUpdateView, add_comment,
+                    edit_profile, get_profile, index, search)
 
 app_name = 'blog'
 
@@ -12,6 +12,9 @@ urlpatterns = [
 
     path('posts/<int:post_id>/', PostDetailView.as_view(), name='post_detail'),
 
+    path('posts/<int:post_id>/comments/', PostCommentsView.as_view(),
+         name='post_comments'),
+
     path('posts/create/', PostCreateView.as_view(), name='create_post'),
 
     path('posts/<int:post_id>/edit/', PostUpdateView.as_view(),
@@ -41,4 +44,6 @@ urlpatterns = [
          name='profile'),
 
     path('edit_profile/', edit_profile, name='edit_profile'),
+
+    path('search/', search, name='search'),
 ]
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.shortcuts import get_object_or_404, render, redirect
 from .models import Category, Post, Comment
 from django.utils import timezone
@@ -5,11 +6,22 @@ from django.urls import reverse, reverse_lazy
 from django.views.generic import CreateView, DeleteView, ListView, UpdateView
 from .forms import CommentForm, PostForm, UserForm
 from django.contrib.auth.models import User
-from django.db.models import Count
-from django.core.paginator import Paginator
+from django.db import transaction
 from django.http import Http404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.utils.decorators import method_decorator
+
+from blogicum.replicas import read_from_replica
+
+from .cache import cache_feed_page, category_scope, index_scope, profile_scope
+from .conditional import (category_state, conditional_page, index_state,
+                          post_state, profile_state)
+from .search import search_posts
+from .timeline import get_timeline_page
+from .paginators import (KEYSET, KeysetPaginator, comment_page_url,
+                         get_comment_page, get_feed_page,
+                         get_pagination_mode)
 
 
 def get_posts(post_objects):
@@ -17,14 +29,18 @@ def get_posts(post_objects):
         pub_date__lte=timezone.now(),
         is_published=True,
         category__is_published=True
-    ).annotate(comment_count=Count('comments'))
+    )
 
 
+@read_from_replica
+@cache_feed_page(index_scope)
+@conditional_page(index_state)
 def index(request):
-    post_list = get_posts(Post.objects).order_by('-pub_date')
-    paginator = Paginator(post_list, 10)
-    page_nubmer = request.GET.get('page')
-    page_obj = paginator.get_page(page_nubmer)
+    post_list = Post.objects.filter_posts_for_publication().count_comments()
+    if settings.MATERIALIZED_TIMELINE:
+        page_obj = get_timeline_page(request)
+    else:
+        page_obj = get_feed_page(request, post_list, 'index')
     return render(request, 'blog/index.html', {'post_list': post_list,
                                                'page_obj': page_obj})
 
@@ -41,38 +57,57 @@ def select_post_objects(obj):
     )
 
 
+@method_decorator(read_from_replica, name='dispatch')
+@method_decorator(conditional_page(post_state), name='dispatch')
 class PostDetailView(ListView):
     template_name = 'blog/detail.html'
-    paginate_by = 10
+    paginate_by = settings.COMMENTS_PER_PAGE
+    _post = None
 
     def get_object(self):
-        post = get_object_or_404(Post, pk=self.kwargs['post_id'])
-        if self.request.user != post.author and (
-            not post.is_published
-            or not post.category.is_published
-            or post.pub_date > timezone.now()
-        ):
-            raise Http404
-        return post
+        if self._post is None:
+            post = get_object_or_404(
+                select_post_objects(Post), pk=self.kwargs['post_id']
+            )
+            if self.request.user != post.author and (
+                not post.is_published
+                or not post.category.is_published
+                or post.pub_date > timezone.now()
+            ):
+                raise Http404
+            self._post = post
+        return self._post
 
     def get_queryset(self):
-        return self.get_object().comments.all()
+        return self.get_object().comments.select_related('author')
+
+    def paginate_queryset(self, queryset, page_size):
+        # Курсор вместо OFFSET: у обсуждаемых постов тысячи комментариев.
+        page = get_comment_page(self.request, queryset, page_size)
+        return page.paginator, page, page.object_list, page.has_other_pages()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
         context['post'] = self.get_object()
-        context['comments'] = (
-            self.get_object().comments.select_related('author').all()
-        )
+        context['comments'] = context['page_obj']
         return context
 
 
+class PostCommentsView(PostDetailView):
+    """Следующая страница комментариев HTML-фрагментом для «Показать ещё»."""
+
+    template_name = 'includes/comment_list.html'
+
+
+@method_decorator(read_from_replica, name='dispatch')
+@method_decorator(cache_feed_page(category_scope), name='dispatch')
+@method_decorator(conditional_page(category_state), name='dispatch')
 class CategoryListView(ListView):
     model = Category
     category = None
     template_name = 'blog/category.html'
-    paginate_by = 10
+    paginate_by = settings.POSTS_PER_PAGE
 
     def dispatch(self, request, *args, **kwargs):
         self.category = get_object_or_404(
@@ -86,7 +121,16 @@ class CategoryListView(ListView):
         return filter_published(select_post_objects(Post).filter(
             category=self.category.id,
             pub_date__lte=timezone.now()
-        )).annotate(comment_count=Count('comments')).order_by('-pub_date')
+        )).order_by('-pub_date')
+
+    def paginate_queryset(self, queryset, page_size):
+        if get_pagination_mode('category_posts') != KEYSET:
+            return super().paginate_queryset(queryset, page_size)
+        page = KeysetPaginator(queryset, page_size).get_page(
+            after=self.request.GET.get('after'),
+            before=self.request.GET.get('before'),
+        )
+        return page.paginator, page, page.object_list, page.has_other_pages()
 
 
 class PostCreateView(LoginRequiredMixin, CreateView):
@@ -94,6 +138,11 @@ class PostCreateView(LoginRequiredMixin, CreateView):
     form_class = PostForm
     template_name = 'blog/create.html'
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['upload_errors'] = getattr(self.request, 'upload_errors', {})
+        return kwargs
+
     def form_valid(self, form):
         form.instance.author = self.request.user
         post = form.save(commit=False)
@@ -112,6 +161,11 @@ class PostUpdateView(LoginRequiredMixin, UpdateView):
     form_class = PostForm
     template_name = 'blog/create.html'
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['upload_errors'] = getattr(self.request, 'upload_errors', {})
+        return kwargs
+
     def get_object(self, **kwargs):
         return get_object_or_404(
             Post,
@@ -170,9 +224,10 @@ def add_comment(request, post_id):
     comment = form.save(commit=False)
     comment.author = request.user
     comment.post = post
-    comment.save()
+    with transaction.atomic():
+        comment.save()
 
-    return redirect('blog:post_detail', post_id=post_id)
+    return redirect(comment_page_url(comment))
 
 
 class CommentUpdateView(LoginRequiredMixin, UpdateView):
@@ -197,10 +252,7 @@ class CommentUpdateView(LoginRequiredMixin, UpdateView):
         )
 
     def get_success_url(self):
-        return reverse(
-            'blog:post_detail',
-            kwargs={'post_id': self.kwargs.get('post_id')}
-        )
+        return comment_page_url(self.object)
 
 
 class CommentDeleteView(LoginRequiredMixin, DeleteView):
@@ -222,17 +274,15 @@ class CommentDeleteView(LoginRequiredMixin, DeleteView):
         )
 
 
+@read_from_replica
+@cache_feed_page(profile_scope)
+@conditional_page(profile_state)
 def get_profile(request, username):
-    profile = get_object_or_404(User, username=username)
-    user_posts = Post.objects.filter(author=profile).annotate(
-        comment_count=Count('comments')).order_by('-pub_date')
-    if not request.user.is_authenticated:
-        user_posts = Post.objects.select_related('author').filter(
-            pub_date__lte=timezone.now(),
-            is_published=True).order_by('-pub_date')
-    paginator = Paginator(user_posts, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    profile = get_object_or_404(
+        User.objects.select_related('stats'), username=username
+    )
+    user_posts = Post.objects.for_profile(profile, request.user)
+    page_obj = get_feed_page(request, user_posts, 'profile')
 
     context = {
         'profile': profile,
@@ -250,3 +300,17 @@ def edit_profile(request):
     if form.is_valid():
         form.save()
         return redirect('blog:index')
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    if query:
+        page_obj = search_posts(
+            get_posts(select_post_objects(Post)),
+            query,
+            settings.POSTS_PER_PAGE,
+            after=request.GET.get('after'),
+        )
+    return render(request, 'blog/search.html', {'query': query,
+                                                'page_obj': page_obj})
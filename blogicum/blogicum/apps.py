@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class BlogicumConfig(AppConfig):
+    name = 'blogicum'
+    verbose_name = 'Blogicum'
+
+    def ready(self):
+        from .database import tune_sqlite_connection
+
+        connection_created.connect(
+            tune_sqlite_connection, dispatch_uid='blogicum.sqlite_pragmas'
+        )
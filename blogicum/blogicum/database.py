@@ -0,0 +1,22 @@
+from django.conf import settings
+
+
+def pragma_statements(pragmas):
+    return [f'PRAGMA {name} = {value}' for name, value in pragmas.items()]
+
+
+def apply_sqlite_pragmas(connection):
+    """Настраивает новое соединение SQLite по ``SQLITE_PRAGMAS``.
+
+    Вызывается на каждое соединение: кроме ``journal_mode`` прагмы
+    действуют только на соединение, которое их выполнило.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(settings.SQLITE_PRAGMAS):
+            cursor.execute(statement)
+
+
+def tune_sqlite_connection(sender, connection, **kwargs):
+    apply_sqlite_pragmas(connection)
@@ -0,0 +1,135 @@
+import heapq
+import logging
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('blogicum.requests')
+
+_request_metrics = ContextVar('request_metrics', default=None)
+
+
+def incr_metric(name, amount=1):
+    metrics = _request_metrics.get()
+    if metrics is not None:
+        metrics[name] += amount
+
+
+class QueryProfiler:
+    """Обёртка ``connection.execute_wrapper``: число, время и самые
+    медленные SQL-запросы.
+    """
+
+    def __init__(self, keep=5):
+        self.keep = keep
+        self.count = 0
+        self.duration = 0.0
+        self._slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            item = (elapsed, self.count, sql)
+            if len(self._slowest) < self.keep:
+                heapq.heappush(self._slowest, item)
+            elif self.keep:
+                heapq.heappushpop(self._slowest, item)
+
+    def slowest(self):
+        """Пары (секунды, SQL) от самого медленного запроса."""
+        return [
+            (elapsed, sql)
+            for elapsed, _, sql in sorted(self._slowest, reverse=True)
+        ]
+
+
+def _server_timing(metrics, profiler, total):
+    entries = [
+        f'db;dur={profiler.duration * 1000:.1f};'
+        f'desc="{profiler.count} queries"',
+        f'tpl;dur={metrics["template_seconds"] * 1000:.1f}',
+    ]
+    for name in ('page_cache', 'fragment_cache'):
+        hits = metrics[f'{name}_hits']
+        misses = metrics[f'{name}_misses']
+        if hits or misses:
+            entries.append(f'{name};desc="hits={hits} misses={misses}"')
+    entries.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(entries)
+
+
+class InstrumentationMiddleware:
+    """Собирает счётчики запроса и отдаёт их в заголовках ответа.
+
+    При ``REQUEST_PROFILING`` ещё и профилирует запрос: число и время
+    SQL-запросов, время шаблонов, попадания в кеши и общее время уходят
+    в заголовок ``Server-Timing``, а запросы дольше
+    ``SLOW_REQUEST_THRESHOLD_MS`` или с числом SQL-запросов больше
+    ``SLOW_REQUEST_QUERY_THRESHOLD`` пишутся в лог ``blogicum.requests``
+    вместе с самыми медленными SQL-запросами.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = Counter()
+        token = _request_metrics.set(metrics)
+        profiler = None
+        try:
+            if not settings.REQUEST_PROFILING:
+                response = self.get_response(request)
+            else:
+                profiler = QueryProfiler(settings.SLOW_REQUEST_LOGGED_QUERIES)
+                start = perf_counter()
+                with ExitStack() as stack:
+                    for connection in connections.all():
+                        stack.enter_context(
+                            connection.execute_wrapper(profiler)
+                        )
+                    response = self.get_response(request)
+                total = perf_counter() - start
+        finally:
+            _request_metrics.reset(token)
+        hits = metrics['fragment_cache_hits']
+        total_cards = hits + metrics['fragment_cache_misses']
+        if total_cards:
+            response['X-Fragment-Cache'] = (
+                f'hits={hits}; misses={total_cards - hits}; '
+                f'ratio={hits / total_cards:.2f}'
+            )
+        if profiler is not None:
+            response['Server-Timing'] = _server_timing(
+                metrics, profiler, total
+            )
+            self.log_slow_request(request, profiler, total)
+        return response
+
+    def log_slow_request(self, request, profiler, total):
+        if (
+            total * 1000 < settings.SLOW_REQUEST_THRESHOLD_MS
+            and profiler.count <= settings.SLOW_REQUEST_QUERY_THRESHOLD
+        ):
+            return
+        slowest = '\n'.join(
+            f'  {elapsed * 1000:.1f} мс: {sql}'
+            for elapsed, sql in profiler.slowest()
+        )
+        logger.warning(
+            'Медленный запрос %s %s: %.0f мс, SQL-запросов %d (%.0f мс)\n%s',
+            request.method,
+            request.get_full_path(),
+            total * 1000,
+            profiler.count,
+            profiler.duration * 1000,
+            slowest,
+        )
@@ -0,0 +1,128 @@
+import logging
+import re
+import sys
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('blogicum.nplusone')
+
+# Запросы, которые Django выполняет при обращении к связанному полю:
+# ``post.author``, ``comment.post``, ``post.comments.all()``.
+LAZY_LOAD_MODULE = 'django.db.models.fields.related_descriptors'
+
+IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+
+
+class NPlusOneError(Exception):
+    """Страница загружает связанные объекты по одному запросу на объект."""
+
+
+def query_shape(sql):
+    """SQL без параметров; списки ``IN (%s, ...)`` любой длины равны."""
+    return IN_LIST_RE.sub('IN (...)', sql)
+
+
+def _origin(frame):
+    """Строка шаблона и строка кода проекта, откуда пришёл запрос.
+
+    Возвращает ``None``, если запрос не вызван ленивой загрузкой
+    связанного поля.
+    """
+    lazy = False
+    template = code = None
+    base_dir = str(settings.BASE_DIR)
+    while frame is not None:
+        if frame.f_globals.get('__name__') == LAZY_LOAD_MODULE:
+            lazy = True
+        elif not lazy:
+            # Обёртки execute_wrapper и сам ORM — ещё не место вызова.
+            pass
+        elif (
+            template is None
+            and frame.f_code.co_name == 'render_annotated'
+        ):
+            node = frame.f_locals.get('self')
+            token = getattr(node, 'token', None)
+            if token is not None:
+                name = node.origin.template_name or node.origin.name
+                template = f'{name}:{token.lineno}'
+        elif (
+            code is None
+            and frame.f_code.co_filename.startswith(base_dir)
+        ):
+            code = f'{frame.f_code.co_filename}:{frame.f_lineno}'
+        frame = frame.f_back
+    if not lazy:
+        return None
+    return template, code
+
+
+class NPlusOneDetector:
+    """Обёртка ``connection.execute_wrapper``, считающая одинаковые
+    ленивые загрузки.
+
+    Запросы одной формы из одного места шаблона или кода, выполненные
+    больше ``threshold`` раз, — признак N+1: связанный объект грузится
+    в цикле вместо ``select_related`` или ``prefetch_related``.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        origin = _origin(sys._getframe(1))
+        if origin is not None:
+            self.counts[(query_shape(sql), *origin)] += 1
+        return execute(sql, params, many, context)
+
+    def problems(self):
+        return [
+            (count, sql, template, code)
+            for (sql, template, code), count in self.counts.most_common()
+            if count > self.threshold
+        ]
+
+
+def describe(request, problems):
+    view = getattr(request.resolver_match, '_func_path', None)
+    lines = [f'N+1 на {request.method} {request.get_full_path()} ({view}):']
+    for count, sql, template, code in problems:
+        place = ', '.join(filter(None, (template, code)))
+        lines.append(f'  {count} раз из {place}: {sql}')
+    return '\n'.join(lines)
+
+
+class NPlusOneMiddleware:
+    """Ищет N+1 при обращении к связанным полям в представлениях и
+    шаблонах.
+
+    ``NPLUSONE_DETECTION`` задаёт реакцию: ``'log'`` пишет найденное в
+    лог ``blogicum.nplusone``, ``'raise'`` бросает ``NPlusOneError``
+    (так тесты падают на любой странице с N+1), ``None`` выключает
+    проверку. Обход стека на каждый SQL-запрос недёшев, поэтому в
+    продакшене проверка выключена.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = settings.NPLUSONE_DETECTION
+        if not mode:
+            return self.get_response(request)
+        detector = NPlusOneDetector(settings.NPLUSONE_THRESHOLD)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(detector))
+            response = self.get_response(request)
+        problems = detector.problems()
+        if problems:
+            message = describe(request, problems)
+            if mode == 'raise':
+                raise NPlusOneError(message)
+            logger.warning(message)
+        return response
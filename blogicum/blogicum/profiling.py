@@ -0,0 +1,30 @@
+from time import perf_counter
+
+from django.template.backends.django import DjangoTemplates, Template
+
+from .middleware import incr_metric
+
+
+class TimedTemplate(Template):
+
+    def render(self, context=None, request=None):
+        start = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            incr_metric('template_seconds', perf_counter() - start)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Шаблонизатор Django, который засекает время рендеринга.
+
+    Меряется только шаблон, отданный представлению: ``include`` и
+    ``extends`` рендерятся внутри него и в сумму входят сами.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
@@ -0,0 +1,146 @@
+import sqlite3
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from functools import wraps
+from itertools import count
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+ROUND_ROBIN = 'round-robin'
+LEAST_LOADED = 'least-loaded'
+
+# Кука «читать с основной базы»: ставится после записи и живёт
+# REPLICA_PIN_SECONDS, пока реплики догоняют основную базу.
+PIN_COOKIE = 'read_primary'
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def reading_from_replica():
+    """Идёт ли чтение внутри ``read_from_replica`` с одной из реплик."""
+    return _read_alias.get() is not None
+
+
+class ReplicaPool:
+    """Выбор реплики: по кругу или с наименьшим числом открытых чтений."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._turn = count()
+        self.active = Counter()
+
+    def acquire(self, replicas):
+        with self._lock:
+            if settings.REPLICA_SELECTION == LEAST_LOADED:
+                alias = min(replicas, key=self.active.__getitem__)
+            else:
+                alias = replicas[next(self._turn) % len(replicas)]
+            self.active[alias] += 1
+        return alias
+
+    def release(self, alias):
+        with self._lock:
+            self.active[alias] -= 1
+
+
+pool = ReplicaPool()
+
+
+def read_from_replica(view):
+    """Все чтения представления, включая рендеринг шаблона, — с реплики.
+
+    Реплика выбирается одна на запрос, чтобы страница не собиралась из
+    разных снимков. Небезопасные методы и пользователи, недавно писавшие
+    в базу, читают с основной базы.
+
+    Кеш лент сбрасывается при коммите в основную базу, а отстающая
+    реплика может ещё отдать старые данные. Поэтому страницы, прочитанные
+    с реплики, ``cache_feed_page`` хранит не дольше REPLICA_PIN_SECONDS.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        replicas = settings.DATABASE_REPLICAS
+        if (
+            not replicas
+            or request.method not in ('GET', 'HEAD')
+            or PIN_COOKIE in request.COOKIES
+        ):
+            return view(request, *args, **kwargs)
+        alias = pool.acquire(replicas)
+        token = _read_alias.set(alias)
+        try:
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+            return response
+        finally:
+            _read_alias.reset(token)
+            pool.release(alias)
+    return wrapper
+
+
+class ReplicaRouter:
+    """Пишет всегда в основную базу, читает с реплики внутри
+    ``read_from_replica``.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы, объекты с них связываются
+        # как свои.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaPinMiddleware:
+    """После успешной записи читает с основной базы REPLICA_PIN_SECONDS.
+
+    Так автор сразу видит свой пост или комментарий, даже если реплика
+    ещё не получила изменения.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            settings.DATABASE_REPLICAS
+            and request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+            and response.status_code < 400
+        ):
+            response.set_cookie(
+                PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+def copy_to_sqlite_replica(alias):
+    """Копирует основную базу SQLite в файл реплики ``alias``.
+
+    Заменяет репликацию при локальной проверке: второй файл SQLite
+    играет роль реплики, отстающей до следующего копирования.
+    """
+    primary = connections[DEFAULT_DB_ALIAS]
+    replica = connections[alias]
+    primary.ensure_connection()
+    replica.close()
+    target = sqlite3.connect(replica.settings_dict['NAME'])
+    try:
+        primary.connection.backup(target)
+    finally:
+        target.close()
@@ -0,0 +1,209 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers)
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+
+# Имена из ContentAddressedStorage и их копии: содержимое по такому
+# имени никогда не меняется.
+HASHED_NAME_RE = re.compile(r'(?:^|/)([0-9a-f]{64})(?:\.\d+w)?\.\w+$')
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# Имена из манифеста статики: ``bootstrap.min.0a1b2c3d4e5f.css``.
+STATIC_HASHED_RE = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+PRECOMPRESSED = (('.br', 'br'), ('.gz', 'gzip'))
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+MUTABLE_MAX_AGE = 60 * 60
+
+
+class RangeFile:
+    """Файл, из которого читается только ``length`` байт с ``start``.
+
+    ``fileno`` и ``tell`` оставлены, чтобы WSGI-сервер с поддержкой
+    ``wsgi.file_wrapper`` (например, gunicorn) мог отдать диапазон через
+    ``sendfile`` без копирования в Python.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Границы ``(start, end)`` одного диапазона ``bytes=``.
+
+    None — заголовок не поддерживается и отдаётся весь файл; ValueError —
+    диапазон лежит за пределами файла (ответ 416).
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def _offload(path, full_path):
+    response = HttpResponse()
+    if settings.MEDIA_SERVING == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + path
+    else:
+        response['X-Sendfile'] = full_path
+    # Тело, длину и диапазоны отдаёт веб-сервер.
+    del response['Content-Type']
+    return response
+
+
+def _file_response(request, full_path, size, etag):
+    response_range = None
+    header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if header and (if_range is None or if_range == etag):
+        try:
+            response_range = parse_range(header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+    file = open(full_path, 'rb')
+    if response_range is None:
+        response = FileResponse(file)
+    else:
+        start, end = response_range
+        response = FileResponse(RangeFile(file, start, end - start + 1),
+                                status=206)
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response.block_size = 64 * 1024
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def _find_file(root, path):
+    try:
+        full_path = safe_join(root, path)
+        stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    return full_path, stat
+
+
+def _file_etag(stat):
+    return quote_etag(f'{stat.st_size:x}-{stat.st_mtime_ns:x}')
+
+
+def _finish(response, etag, stat, immutable):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if immutable:
+        patch_cache_control(
+            response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True
+        )
+    else:
+        patch_cache_control(response, public=True, max_age=MUTABLE_MAX_AGE)
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Отдаёт файл из MEDIA_ROOT и в production.
+
+    При ``MEDIA_SERVING = 'x-sendfile'`` или ``'x-accel-redirect'`` файл
+    отдаёт веб-сервер по заголовку ответа, иначе — ``FileResponse`` с
+    поддержкой ``Range``. Файлы с хешем содержимого в имени кешируются
+    навсегда, остальные — на MUTABLE_MAX_AGE; ETag и If-None-Match
+    работают в обоих случаях.
+    """
+    full_path, stat = _find_file(settings.MEDIA_ROOT, path)
+    hashed = HASHED_NAME_RE.search(path)
+    if hashed:
+        etag = quote_etag(os.path.basename(path))
+    else:
+        etag = _file_etag(stat)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        if settings.MEDIA_SERVING in ('x-sendfile', 'x-accel-redirect'):
+            response = _offload(path, full_path)
+        else:
+            response = _file_response(request, full_path, stat.st_size, etag)
+        content_type, encoding = mimetypes.guess_type(full_path)
+        if content_type and not encoding:
+            response['Content-Type'] = content_type
+    return _finish(response, etag, stat, hashed)
+
+
+def _accepted_encodings(request):
+    accepted = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00'):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+@require_safe
+def serve_static(request, path):
+    """Отдаёт собранную статику из STATIC_ROOT.
+
+    Если клиент принимает ``br`` или ``gzip`` и ``collectstatic`` положил
+    рядом сжатую копию, отдаётся она с ``Content-Encoding``. Имена с
+    хешем из манифеста кешируются навсегда.
+    """
+    full_path, stat = _find_file(settings.STATIC_ROOT, path)
+    content_type, _ = mimetypes.guess_type(full_path)
+    accepted = _accepted_encodings(request)
+    content_encoding = None
+    for suffix, encoding in PRECOMPRESSED:
+        if encoding in accepted and os.path.isfile(full_path + suffix):
+            full_path += suffix
+            stat = os.stat(full_path)
+            content_encoding = encoding
+            break
+    etag = _file_etag(stat)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        if content_encoding:
+            response = FileResponse(open(full_path, 'rb'))
+            response['Content-Encoding'] = content_encoding
+            del response['Content-Disposition']
+        else:
+            response = _file_response(request, full_path, stat.st_size, etag)
+        response['Content-Type'] = content_type or 'application/octet-stream'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return _finish(response, etag, stat, STATIC_HASHED_RE.search(path))
@@ -19,6 +19,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'blogicum.apps.BlogicumConfig',
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
     'users.apps.UsersConfig',
@@ -26,6 +27,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blogicum.middleware.InstrumentationMiddleware',
+    'blogicum.nplusone.NPlusOneMiddleware',
+    'blogicum.replicas.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -41,7 +45,7 @@ TEMPLATES_DIR = BASE_DIR / 'templates'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'blogicum.profiling.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -57,11 +61,81 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
+# Профилирование запросов в InstrumentationMiddleware: заголовок
+# Server-Timing и журнал медленных запросов. Стоит пары обёрток вокруг
+# выполнения SQL и рендеринга шаблона, а Server-Timing показывает
+# любому клиенту время и число запросов к базе, поэтому по умолчанию
+# включено только при отладке.
+REQUEST_PROFILING = DEBUG
+
+SLOW_REQUEST_THRESHOLD_MS = 500
+
+SLOW_REQUEST_QUERY_THRESHOLD = 50
+
+# Сколько самых медленных SQL-запросов писать в журнал.
+SLOW_REQUEST_LOGGED_QUERIES = 5
+
+# Поиск N+1 в NPlusOneMiddleware: 'log', 'raise' или None. Тесты
+# включают 'raise', в продакшене проверка выключена.
+NPLUSONE_DETECTION = 'log' if DEBUG else None
+
+# Сколько одинаковых ленивых загрузок из одного места ещё не N+1.
+NPLUSONE_THRESHOLD = 2
+
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение живёт между запросами, и прагмы ниже не выполняются
+        # заново на каждый запрос.
+        'CONN_MAX_AGE': 60,
+    },
+    # Реплика для локальной проверки чтения с реплик: второй файл
+    # SQLite, который заполняет команда sync_sqlite_replicas. В тестах
+    # это та же база, что и default.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'CONN_MAX_AGE': 60,
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_ROUTERS = ['blogicum.replicas.ReplicaRouter']
+
+# Алиасы реплик, с которых читают ленты, страницы постов и профили;
+# пустой список — всё читается с default. Например, ['replica'].
+DATABASE_REPLICAS = []
+
+# 'round-robin' или 'least-loaded' — меньше всего открытых чтений.
+REPLICA_SELECTION = 'round-robin'
+
+# Сколько секунд реплики могут отставать. Столько после записи
+# пользователь читает с основной базы, чтобы видеть свои посты и
+# комментарии, и не дольше кешируются ленты, прочитанные с реплики.
+REPLICA_PIN_SECONDS = 10
+
+# Прагмы, которые выполняются на каждом новом соединении с SQLite.
+# WAL не даёт записи комментария блокировать чтение ленты, а
+# synchronous=NORMAL в режиме WAL не теряет целостность базы и
+# избавляет от fsync на каждый коммит. busy_timeout — сколько
+# миллисекунд ждать чужую запись вместо ошибки «database is locked».
+# Пустой словарь оставляет настройки SQLite по умолчанию.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — размер в КиБ, а не в страницах.
+    'cache_size': -32 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blogicum',
     }
 }
 
@@ -97,14 +171,92 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [BASE_DIR / 'static_dev']
 
+STATIC_ROOT = BASE_DIR / 'static'
+
+# Имена с хешем содержимого и манифест staticfiles.json; рядом с текстовыми
+# файлами collectstatic кладёт .gz и, если установлен brotli, .br.
+STATICFILES_STORAGE = (
+    'blogicum.staticfiles.CompressedManifestStaticFilesStorage'
+)
+
+# 'django' — blogicum.serving.serve_static отдаёт STATIC_ROOT со сжатыми
+# копиями; 'external' — статику раздаёт веб-сервер или CDN.
+STATIC_SERVING = 'django'
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MAX_LENGTH = 256
 
+POSTS_PER_PAGE = 10
+
+COMMENTS_PER_PAGE = 10
+
+# Сколько секунд хранить ленты для анонимов; 0 отключает кеш.
+FEED_CACHE_TIMEOUT = 300
+
+# Сколько секунд хранить отрендеренные карточки постов.
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+
+# Конфигурация словаря для полнотекстового поиска на PostgreSQL.
+SEARCH_CONFIG = 'russian'
+
+# Ширина уменьшенных копий Post.image в CSS-пикселях: для каждой ширины
+# строятся копии под плотности экрана из POST_IMAGE_DENSITIES, в WebP и
+# в формате-запасном (JPEG или PNG для картинок с прозрачностью).
+POST_IMAGE_RENDITIONS = {
+    'feed': 640,
+    'detail': 1200,
+}
+
+POST_IMAGE_DENSITIES = (1, 2)
+
+# Потоков фоновой обработки загруженных фото; 0 — обрабатывать сразу,
+# в потоке запроса.
+POST_IMAGE_WORKERS = 2
+
+# Пределы загружаемых фото. Более широкие оригиналы фоновая обработка
+# ужимает до POST_IMAGE_MAX_WIDTH, заодно удаляя EXIF; очищенный файл
+# сохраняется под новым хешем.
+POST_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+
+POST_IMAGE_MAX_PIXELS = 40_000_000
+
+POST_IMAGE_MAX_WIDTH = 2400
+
+# Сколько секунд не удалять недавно сохранённые или повторно
+# использованные фото: ссылка на них может быть ещё не закоммичена.
+POST_IMAGE_RELEASE_GRACE = 300
+
+# Загрузки сразу пишутся во временный файл и проверяются на лету.
+FILE_UPLOAD_HANDLERS = [
+    'blog.uploads.BoundedImageUploadHandler',
+]
+
+# Режим пагинации лент: 'offset' (?page=N) или 'keyset' (?after=/?before=).
+FEED_PAGINATION = {
+    'index': 'offset',
+    'category_posts': 'offset',
+    'profile': 'offset',
+}
+
+# Главная лента читается из материализованной таблицы TimelineEntry
+# вместо запроса к постам с соединениями. Таблица ведётся всегда, так что
+# флаг можно включать без пересборки (см. команду rebuild_timeline).
+MATERIALIZED_TIMELINE = False
+
 MEDIA_ROOT = BASE_DIR / 'media'
 
 MEDIA_URL = 'media/'
 
+# Как отдавать MEDIA_ROOT: 'django' — blogicum.serving.serve_media с
+# Range и sendfile; 'x-sendfile' (Apache, lighttpd) или 'x-accel-redirect'
+# (nginx) — тот же view проверяет путь и ставит заголовки, а файл отдаёт
+# веб-сервер; 'external' — медиа раздаются в обход Django (CDN).
+MEDIA_SERVING = 'django'
+
+# Внутренний location nginx, смотрящий на MEDIA_ROOT.
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
@@ -0,0 +1,63 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.txt', '.json', '.xml', '.html', '.ico',
+    '.map', '.webmanifest',
+)
+
+
+def _gzip(data):
+    # mtime=0: одинаковые файлы дают одинаковые архивы при каждой сборке.
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+COMPRESSORS = {'.gz': _gzip}
+if brotli is not None:
+    COMPRESSORS['.br'] = brotli.compress
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хешем в имени и заранее сжатыми копиями.
+
+    ``collectstatic`` кладёт рядом с каждым текстовым файлом ``.gz`` и,
+    если установлен пакет ``brotli``, ``.br`` — их выбирает
+    ``blogicum.serving.serve_static``. Без ``staticfiles.json`` (статика
+    не собрана) ``{% static %}`` отдаёт исходные имена вместо ошибки.
+    """
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in self.hashed_files.values():
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as file:
+            data = file.read()
+        for suffix, compressor in COMPRESSORS.items():
+            compressed = compressor(data)
+            # Сжатая копия, которая не меньше оригинала, не нужна.
+            if len(compressed) >= len(data):
+                continue
+            target = name + suffix
+            if self.exists(target):
+                self.delete(target)
+            self._save(target, ContentFile(compressed))
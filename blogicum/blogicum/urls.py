@@ -1,15 +1,26 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from .serving import serve_media, serve_static
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('pages/', include('pages.urls', namespace='pages')),
     path('', include('blog.urls', namespace='blog')),
     path('auth/', include('django.contrib.auth.urls')),
     path('auth/registration/', include('users.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+if settings.STATIC_SERVING != 'external':
+    urlpatterns.append(
+        path(f"{settings.STATIC_URL.strip('/')}/<path:path>", serve_static)
+    )
+
+if settings.MEDIA_SERVING != 'external':
+    urlpatterns.append(
+        path(f"{settings.MEDIA_URL.strip('/')}/<path:path>", serve_media)
+    )
 
 handler403 = 'pages.views.csrf_failure'
 
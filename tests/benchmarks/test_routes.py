@@ -0,0 +1,188 @@
+"""Бенчмарк всех именованных страниц blog, pages и users.
+
+Запуск: ``BLOG_BENCHMARK=1 pytest tests/benchmarks``. Для каждой страницы
+замеряются число SQL-запросов, p50/p95 времени ответа и пик выделенной
+памяти. Результат сравнивается с ``baseline.json``; тест падает, если
+число запросов выросло или время и память превысили базовые значения
+больше чем на ``BLOG_BENCHMARK_THRESHOLD``. ``BLOG_BENCHMARK_UPDATE=1``
+перезаписывает базовый файл.
+
+Масштаб данных задаётся ``BLOG_BENCHMARK_SCALE`` в виде
+``users,categories,posts,comments``.
+"""
+import json
+import os
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+from importlib import import_module
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        not os.environ.get('BLOG_BENCHMARK'),
+        reason='Бенчмарк запускается с переменной окружения BLOG_BENCHMARK=1',
+    ),
+]
+
+BASELINE_PATH = Path(os.environ.get(
+    'BLOG_BENCHMARK_BASELINE', Path(__file__).parent / 'baseline.json'
+))
+SCALE = os.environ.get('BLOG_BENCHMARK_SCALE', '20,5,200,1000')
+ROUNDS = int(os.environ.get('BLOG_BENCHMARK_ROUNDS', 20))
+THRESHOLD = float(os.environ.get('BLOG_BENCHMARK_THRESHOLD', 0.5))
+# Ниже этих порогов разница — шум таймера и аллокатора, а не регрессия.
+MIN_LATENCY_DELTA_MS = 5
+MIN_MEMORY_DELTA_KB = 256
+
+URL_MODULES = ('blog.urls', 'pages.urls', 'users.urls')
+
+
+@pytest.fixture
+def dataset(mixer):
+    n_users, n_categories, n_posts, n_comments = map(int, SCALE.split(','))
+    rng = random.Random(0)
+    now = timezone.now()
+    users = mixer.cycle(n_users).blend(get_user_model())
+    categories = mixer.cycle(n_categories).blend(
+        'blog.Category', is_published=True
+    )
+    locations = mixer.cycle(n_categories).blend(
+        'blog.Location', is_published=True
+    )
+    posts = mixer.cycle(n_posts).blend(
+        'blog.Post',
+        author=(rng.choice(users) for _ in range(n_posts)),
+        category=(rng.choice(categories) for _ in range(n_posts)),
+        location=(rng.choice(locations) for _ in range(n_posts)),
+        # Явные даты, чтобы состав страниц не менялся от запуска к запуску.
+        pub_date=(now - timedelta(hours=hour) for hour in range(n_posts)),
+        is_published=True,
+    )
+    # Больше всего комментариев у первого поста: его страница и меряется.
+    commented = [posts[0]] * (n_comments // 2) + [
+        rng.choice(posts) for _ in range(n_comments - n_comments // 2)
+    ]
+    mixer.cycle(n_comments).blend(
+        'blog.Comment',
+        post=(post for post in commented),
+        author=(rng.choice(users) for _ in range(n_comments)),
+    )
+    post = posts[0]
+    comment = mixer.blend('blog.Comment', post=post, author=post.author)
+    return {
+        'post_id': post.pk,
+        'comment_id': comment.pk,
+        'category_slug': post.category.slug,
+        'username': post.author.username,
+        'author': post.author,
+        'query': post.title.split()[0],
+    }
+
+
+def named_routes():
+    """Имена маршрутов из URL_MODULES и имена их параметров."""
+    routes = {}
+    for module_name in URL_MODULES:
+        module = import_module(module_name)
+        namespace = getattr(module, 'app_name', None)
+        for pattern in module.urlpatterns:
+            if pattern.name:
+                name = (
+                    f'{namespace}:{pattern.name}' if namespace
+                    else pattern.name
+                )
+                # Маршруты с одинаковым именем меряются по первому.
+                routes.setdefault(name, list(pattern.pattern.converters))
+    return routes
+
+
+def route_url(name, params, data):
+    url = reverse(name, kwargs={param: data[param] for param in params})
+    if name == 'blog:search':
+        url += f'?q={data["query"]}'
+    return url
+
+
+def measure(client, url):
+    with CaptureQueriesContext(connection) as context:
+        status = client.get(url).status_code
+    queries = len(context.captured_queries)
+
+    tracemalloc.start()
+    client.get(url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        client.get(url)
+        timings.append((time.perf_counter() - start) * 1000)
+    percentiles = statistics.quantiles(timings, n=20)
+    return {
+        'url': url,
+        'status': status,
+        'queries': queries,
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(percentiles[-1], 2),
+        'memory_kb': round(peak / 1024, 1),
+    }
+
+
+def regressions(name, result, baseline):
+    problems = []
+    if result['queries'] > baseline['queries']:
+        problems.append(
+            f'{name}: запросов {result["queries"]} '
+            f'вместо {baseline["queries"]}'
+        )
+    limits = (
+        ('p95_ms', MIN_LATENCY_DELTA_MS),
+        ('memory_kb', MIN_MEMORY_DELTA_KB),
+    )
+    for metric, min_delta in limits:
+        allowed = max(baseline[metric] * THRESHOLD, min_delta)
+        if result[metric] > baseline[metric] + allowed:
+            problems.append(
+                f'{name}: {metric} {result[metric]} '
+                f'при базовом {baseline[metric]}'
+            )
+    return problems
+
+
+def test_routes_do_not_regress(dataset):
+    client = Client()
+    client.force_login(dataset['author'])
+    results = {}
+    for name, params in named_routes().items():
+        results[name] = measure(client, route_url(name, params, dataset))
+
+    baseline = {}
+    if BASELINE_PATH.exists():
+        baseline = json.loads(BASELINE_PATH.read_text())
+    if os.environ.get('BLOG_BENCHMARK_UPDATE') or not baseline:
+        BASELINE_PATH.write_text(
+            json.dumps(results, indent=2, ensure_ascii=False) + '\n'
+        )
+        return
+
+    problems = []
+    for name, result in results.items():
+        if name in baseline:
+            problems += regressions(name, result, baseline[name])
+    assert not problems, (
+        'Производительность страниц ухудшилась относительно '
+        f'{BASELINE_PATH.name}:\n' + '\n'.join(problems)
+    )
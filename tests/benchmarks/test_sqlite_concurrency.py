@@ -0,0 +1,136 @@
+"""Бенчмарк конкурентного чтения и записи SQLite с прагмами и без.
+
+Запуск: ``BLOG_BENCHMARK=1 pytest tests/benchmarks -s``. Читатели
+выбирают страницу свежих комментариев, писатели добавляют комментарии
+по одному, как ``add_comment``; у каждого потока своё соединение через
+бэкенд Django, так что прагмы ставит тот же обработчик
+``connection_created``, что и в работе. Для настроек по умолчанию и для
+``SQLITE_PRAGMAS`` печатаются операции в секунду и ошибки
+«database is locked». Тест падает, если с прагмами были такие ошибки
+или запись и чтение стали медленнее.
+
+Число потоков и длительность задаются ``BLOG_BENCHMARK_READERS``,
+``BLOG_BENCHMARK_WRITERS`` и ``BLOG_BENCHMARK_SECONDS``.
+"""
+import os
+import threading
+import time
+from collections import Counter
+
+import pytest
+from django.conf import settings
+from django.db import OperationalError, connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import override_settings
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        not os.environ.get('BLOG_BENCHMARK'),
+        reason='Бенчмарк запускается с переменной окружения BLOG_BENCHMARK=1',
+    ),
+]
+
+READERS = int(os.environ.get('BLOG_BENCHMARK_READERS', 4))
+WRITERS = int(os.environ.get('BLOG_BENCHMARK_WRITERS', 2))
+SECONDS = float(os.environ.get('BLOG_BENCHMARK_SECONDS', 3))
+SEED_ROWS = 10_000
+
+SCHEMA = (
+    'CREATE TABLE comment (id INTEGER PRIMARY KEY, post_id INTEGER, '
+    'text TEXT, created_at REAL)',
+    'CREATE INDEX comment_post_idx ON comment (post_id, created_at)',
+)
+READ_SQL = (
+    'SELECT id, text, created_at FROM comment WHERE post_id = %s '
+    'ORDER BY created_at DESC LIMIT 10'
+)
+WRITE_SQL = (
+    'INSERT INTO comment (post_id, text, created_at) VALUES (%s, %s, %s)'
+)
+
+
+def open_database(path):
+    return DatabaseWrapper({**connection.settings_dict, 'NAME': str(path)})
+
+
+def seed(path):
+    db = open_database(path)
+    with db.cursor() as cursor:
+        for statement in SCHEMA:
+            cursor.execute(statement)
+        cursor.executemany(WRITE_SQL, [
+            (row % 100, f'Комментарий {row}', row) for row in range(SEED_ROWS)
+        ])
+    db.close()
+
+
+def worker(path, sql, params, deadline, totals, lock):
+    db = open_database(path)
+    done = Counter()
+    try:
+        while time.perf_counter() < deadline:
+            try:
+                with db.cursor() as cursor:
+                    cursor.execute(sql, params())
+                    cursor.fetchall()
+                done['ops'] += 1
+            except OperationalError:
+                done['locked'] += 1
+    finally:
+        db.close()
+    with lock:
+        totals.update(done)
+
+
+def run(path):
+    reads, writes = Counter(), Counter()
+    lock = threading.Lock()
+    deadline = time.perf_counter() + SECONDS
+    threads = [
+        threading.Thread(target=worker, args=(
+            path, READ_SQL, lambda: (time.time_ns() % 100,),
+            deadline, reads, lock,
+        ))
+        for _ in range(READERS)
+    ] + [
+        threading.Thread(target=worker, args=(
+            path, WRITE_SQL, lambda: (0, 'Новый комментарий', time.time()),
+            deadline, writes, lock,
+        ))
+        for _ in range(WRITERS)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        'reads_per_s': round(reads['ops'] / SECONDS),
+        'writes_per_s': round(writes['ops'] / SECONDS),
+        'locked': reads['locked'] + writes['locked'],
+    }
+
+
+def test_pragmas_improve_concurrency(tmp_path):
+    results = {}
+    profiles = (
+        ('по умолчанию', {}),
+        ('SQLITE_PRAGMAS', settings.SQLITE_PRAGMAS),
+    )
+    for number, (name, pragmas) in enumerate(profiles):
+        path = tmp_path / f'{number}.sqlite3'
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            seed(path)
+            results[name] = run(path)
+    for name, result in results.items():
+        print(f'{name}: {result}')
+
+    before, after = results['по умолчанию'], results['SQLITE_PRAGMAS']
+    assert after['locked'] == 0, (
+        'Убедитесь, что с прагмами запись и чтение ждут блокировку, '
+        f'а не падают с «database is locked»: {after}'
+    )
+    assert (
+        after['reads_per_s'] >= before['reads_per_s']
+        and after['writes_per_s'] >= before['writes_per_s']
+    ), f'Прагмы замедлили SQLite: {before} против {after}'
@@ -41,6 +41,31 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def render_images_inline():
+    # Фоновый поток обработки фото пережил бы тест и писал бы в базу,
+    # которую уже очищает следующий тест.
+    with override_settings(POST_IMAGE_WORKERS=0):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def fail_on_n_plus_one():
+    # Любая страница, загружающая связанные объекты в цикле, роняет тест.
+    with override_settings(NPLUSONE_DETECTION='raise'):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Откат транзакции после теста не откатывает кеш, поэтому страницы
+    # и поколения инвалидации из прошлых тестов сбрасываются явно.
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
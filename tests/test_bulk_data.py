@@ -0,0 +1,83 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from blog.bulk_data import JSONArrayReader
+from blog.models import (Category, Comment, Location, Post, TimelineEntry,
+                         UserStats)
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def blog_data(mixer, published_category):
+    posts = mixer.cycle(3).blend(
+        'blog.Post', category=published_category, location__is_published=True
+    )
+    mixer.cycle(4).blend('blog.Comment', post=posts[0])
+    return posts
+
+
+@pytest.mark.parametrize('filename', ['blog.json', 'blog.ndjson'])
+def test_dump_and_load_round_trip(tmp_path, blog_data, filename):
+    path = tmp_path / filename
+    call_command('dump_blog_data', output=str(path), stderr=StringIO())
+    post = Post.objects.get(pk=blog_data[0].pk)
+    for model in (get_user_model(), Category, Location):
+        model.objects.all().delete()
+    assert not Post.objects.exists()
+
+    call_command('load_blog_data', str(path), batch_size=2, stdout=StringIO())
+    loaded = Post.objects.get(pk=post.pk)
+    assert Comment.objects.count() == 4
+    # Как и dumpdata, JSON хранит время с точностью до миллисекунд.
+    created_at = post.created_at.replace(
+        microsecond=post.created_at.microsecond // 1000 * 1000
+    )
+    assert loaded.created_at == created_at, (
+        'Убедитесь, что загрузка сохраняет даты из файла, а не ставит '
+        'текущие.'
+    )
+    assert loaded.comment_count == 4, (
+        'Убедитесь, что после загрузки пересчитываются счётчики '
+        'комментариев.'
+    )
+    assert TimelineEntry.objects.count() == Post.objects.count()
+    assert UserStats.objects.get(user=loaded.author).post_count == 1
+
+
+def test_reader_parses_array_in_small_chunks():
+    stream = StringIO('[ {"a": 1} ,\n {"b": [2, "]"]} ]')
+    assert list(JSONArrayReader(stream, chunk_size=3)) == [
+        {'a': 1}, {'b': [2, ']']}
+    ]
+
+
+class CountingStream(StringIO):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+def test_reader_reports_malformed_json_at_once():
+    head = '[{"a": 1}, {"b": x}'
+    stream = CountingStream(head + ', {"c": 3}' * 10000 + ']')
+    with pytest.raises(ValueError, match=f'символе {head.index("x")}:'):
+        list(JSONArrayReader(stream, chunk_size=64))
+    assert stream.reads == 1, (
+        'Убедитесь, что ошибка в JSON сообщается сразу, без дочитывания '
+        'файла до конца.'
+    )
+
+
+def test_reader_reports_truncated_array():
+    stream = StringIO('[{"a": 1}, {"b": "незакрытая')
+    with pytest.raises(ValueError, match='оборвался'):
+        list(JSONArrayReader(stream, chunk_size=4))
@@ -0,0 +1,45 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def comment_count(post):
+    return Post.objects.values_list('comment_count', flat=True).get(
+        pk=post.pk
+    )
+
+
+def test_comment_count_follows_comments(
+    mixer, user, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    for text in ('Первый', 'Второй', 'Третий'):
+        user_client.post(f'/posts/{post.id}/comment/', {'text': text})
+    assert comment_count(post) == 3, (
+        'Убедитесь, что счётчик комментариев растёт при их создании.'
+    )
+
+    comment = Comment.objects.filter(post=post, author=user).first()
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    assert comment_count(post) == 2, (
+        'Убедитесь, что счётчик комментариев уменьшается при удалении '
+        'комментария.'
+    )
+
+    Comment.objects.filter(post=post).delete()
+    assert comment_count(post) == 0, (
+        'Убедитесь, что счётчик комментариев учитывает массовое удаление.'
+    )
+
+
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(4).blend('blog.Comment', post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+    call_command('recount_comments', batch_size=1, stdout=StringIO())
+    assert comment_count(post) == 4
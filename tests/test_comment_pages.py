@@ -0,0 +1,89 @@
+import pytest
+
+from blog.paginators import encode_cursor
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_comments(mixer, post_with_published_location):
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        'blog.Comment', post=post_with_published_location
+    )
+
+
+def test_fragment_returns_next_comments(
+    user_client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    page = user_client.get(f'/posts/{post.id}/').context['comments']
+    response = user_client.get(
+        f'/posts/{post.id}/comments/', {'after': page.next_cursor}
+    )
+    content = response.content.decode()
+    assert list(response.context['comments']) == many_comments[
+        N_PER_PAGE:N_PER_PAGE * 2
+    ], (
+        'Убедитесь, что фрагмент комментариев отдаёт страницу после '
+        'курсора.'
+    )
+    assert '<html' not in content, (
+        'Убедитесь, что фрагмент комментариев отдаётся без шаблона страницы.'
+    )
+    assert f'comment_{many_comments[N_PER_PAGE].id}' in content
+    assert 'Показать ещё' in content
+
+
+def test_new_comment_redirects_to_its_page(
+    user_client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    response = user_client.post(
+        f'/posts/{post.id}/comment/', {'text': 'Последний комментарий'}
+    )
+    comment = post.comments.latest('created_at')
+    assert response.url.endswith(f'#comment_{comment.id}'), (
+        'Убедитесь, что после комментария пользователь попадает к якорю '
+        'нового комментария.'
+    )
+    landing = user_client.get(response.url).context['comments']
+    assert comment in landing, (
+        'Убедитесь, что ссылка на комментарий ведёт на страницу, где он '
+        'показан.'
+    )
+    # Та же страница, что при переходе «Показать ещё» от начала.
+    assert landing[0] == many_comments[N_PER_PAGE * 2]
+
+
+def test_first_page_comment_link_has_no_cursor(
+    user, user_client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    comment = many_comments[3]
+    comment.author = user
+    comment.save()
+    response = user_client.post(
+        f'/posts/{post.id}/edit_comment/{comment.id}/',
+        {'text': 'Исправленный комментарий'},
+    )
+    assert response.url == f'/posts/{post.id}/#comment_{comment.id}'
+
+
+@pytest.mark.parametrize('url', ['/posts/{id}/', '/posts/{id}/comments/'])
+@pytest.mark.parametrize('cursor', [
+    encode_cursor([1, 1]), encode_cursor([{}, 'id']),
+])
+def test_crafted_cursor_opens_first_page(
+    client, post_with_published_location, many_comments, url, cursor
+):
+    url = url.format(id=post_with_published_location.id)
+    for direction in ('after', 'before'):
+        response = client.get(url, {direction: cursor})
+        assert response.status_code == 200, (
+            'Убедитесь, что курсор со значениями не тех типов не роняет '
+            'страницу поста.'
+        )
+        assert list(response.context['comments']) == many_comments[
+            :N_PER_PAGE
+        ]
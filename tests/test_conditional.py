@@ -0,0 +1,105 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+
+from blog.conditional import index_state
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_detail_returns_not_modified(
+    mixer, user_client, post_with_published_location
+):
+    url = f'/posts/{post_with_published_location.id}/'
+    response = user_client.get(url)
+    etag = response['ETag']
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304, (
+        'Убедитесь, что страница поста отвечает 304, если ETag не изменился.'
+    )
+
+    mixer.blend('blog.Comment', post=post_with_published_location)
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        'Убедитесь, что новый комментарий меняет ETag страницы поста.'
+    )
+
+
+def test_cached_feed_returns_not_modified(
+    client, post_with_published_location
+):
+    etag = client.get('/')['ETag']
+    response = client.get('/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304, (
+        'Убедитесь, что лента отвечает 304 и при попадании в кеш страниц.'
+    )
+
+
+def test_deleted_post_changes_feed_etag(
+    mixer, user_client, published_category, post_with_published_location
+):
+    newest = mixer.blend(
+        'blog.Post', category=published_category, title='Свежий пост'
+    )
+    response = user_client.get('/')
+    assert not response.has_header('Last-Modified'), (
+        'Убедитесь, что лента не отдаёт Last-Modified: удаление поста '
+        'не сдвигает его вперёд.'
+    )
+    newest.delete()
+    response = user_client.get(
+        '/', HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+    )
+    assert response.status_code == 200
+    assert 'Свежий пост' not in response.content.decode()
+
+
+def test_scheduled_post_changes_feed_etag(
+    mixer, user_client, published_category, post_with_published_location
+):
+    scheduled = mixer.blend(
+        'blog.Post', category=published_category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    etag = user_client.get('/')['ETag']
+    # Время публикации наступило: строка в базе при этом не меняется.
+    Post.objects.filter(pk=scheduled.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    response = user_client.get('/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        'Убедитесь, что выход отложенного поста меняет ETag ленты.'
+    )
+
+
+def test_feed_validator_is_cheap(rf, user, post_with_published_location):
+    request = rf.get('/')
+    request.user = user
+    with CaptureQueriesContext(connection) as context:
+        index_state(request)
+    assert len(context.captured_queries) <= 1
+    assert 'COUNT(' not in context.captured_queries[0]['sql'], (
+        'Убедитесь, что валидатор ленты не пересчитывает все посты.'
+    )
+
+
+def test_commenter_rename_changes_post_etag(
+    mixer, another_user, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.blend('blog.Comment', post=post, author=another_user)
+    url = f'/posts/{post.id}/'
+    etag = user_client.get(url)['ETag']
+    another_user.username = 'renamed_commenter'
+    another_user.save()
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        'Убедитесь, что смена имени комментатора меняет ETag страницы поста.'
+    )
+    assert 'renamed_commenter' in response.content.decode()
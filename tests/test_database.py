@@ -0,0 +1,35 @@
+import pytest
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+pytestmark = [pytest.mark.django_db]
+
+
+def pragma(db, name):
+    with db.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+def test_connection_gets_pragmas():
+    assert pragma(connection, 'synchronous') == 1, (
+        'Убедитесь, что соединение с SQLite работает с synchronous=NORMAL.'
+    )
+    assert pragma(connection, 'busy_timeout') == 5000
+    assert pragma(connection, 'temp_store') == 2
+
+
+def test_file_database_uses_wal(settings, tmp_path):
+    db = DatabaseWrapper({
+        **connection.settings_dict, 'NAME': str(tmp_path / 'db.sqlite3')
+    })
+    try:
+        assert pragma(db, 'journal_mode') == 'wal', (
+            'Убедитесь, что файл базы переводится в режим WAL, чтобы запись '
+            'комментариев не блокировала чтение ленты.'
+        )
+        settings.SQLITE_PRAGMAS = {}
+        db.close()
+        assert pragma(db, 'synchronous') == 2
+    finally:
+        db.close()
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.cache import INDEX, category_scope, feed_cache_timeout
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_with_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response.content.decode(), len(context.captured_queries)
+
+
+def test_anonymous_feed_is_served_from_cache(
+    client, post_with_published_location
+):
+    get_with_queries(client, '/')
+    _, queries = get_with_queries(client, '/')
+    assert queries == 0, (
+        'Убедитесь, что повторный запрос ленты анонимом отдаётся из кеша.'
+    )
+
+
+def test_logged_in_feed_is_not_cached(
+    user_client, post_with_published_location
+):
+    get_with_queries(user_client, '/')
+    _, queries = get_with_queries(user_client, '/')
+    assert queries > 0
+
+
+@pytest.mark.parametrize(
+    'url', ['/', '/category/{slug}/', '/profile/{username}/']
+)
+def test_post_change_purges_feed(
+    mixer, client, user, published_category, post_with_published_location,
+    url,
+):
+    url = url.format(slug=published_category.slug, username=user.username)
+    get_with_queries(client, url)
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Свежая публикация',
+    )
+    content, _ = get_with_queries(client, url)
+    assert 'Свежая публикация' in content, (
+        'Убедитесь, что кеш ленты сбрасывается при создании поста.'
+    )
+
+
+def test_comment_purges_feed(mixer, client, post_with_published_location):
+    get_with_queries(client, '/')
+    mixer.cycle(3).blend('blog.Comment', post=post_with_published_location)
+    content, _ = get_with_queries(client, '/')
+    assert 'Комментарии (3)' in content
+
+
+def test_unrelated_category_page_stays_cached(
+    mixer, client, published_category, another_category,
+    post_with_published_location,
+):
+    url = f'/category/{published_category.slug}/'
+    get_with_queries(client, url)
+    mixer.blend('blog.Post', category=another_category)
+    _, queries = get_with_queries(client, url)
+    assert queries == 0, (
+        'Убедитесь, что пост в другой категории не сбрасывает кеш '
+        'чужой категории.'
+    )
+
+
+def test_timeout_stops_at_scheduled_post(mixer, published_category):
+    mixer.blend(
+        'blog.Post',
+        category=published_category,
+        pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    assert feed_cache_timeout(INDEX) <= 30
+    assert feed_cache_timeout(category_scope(published_category.slug)) <= 30
+    assert feed_cache_timeout(category_scope('other')) > 30
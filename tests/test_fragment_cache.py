@@ -0,0 +1,66 @@
+import pytest
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def fragment_stats(response):
+    header = response['X-Fragment-Cache']
+    return dict(
+        (name, float(value))
+        for name, value in (part.split('=') for part in header.split('; '))
+    )
+
+
+def test_post_cards_are_cached(
+    user_client, many_posts_with_published_locations
+):
+    first = fragment_stats(user_client.get('/'))
+    assert first['misses'] == N_PER_PAGE
+    second = fragment_stats(user_client.get('/'))
+    assert second['hits'] == N_PER_PAGE and second['ratio'] == 1, (
+        'Убедитесь, что повторная отрисовка ленты берёт карточки постов '
+        'из кеша.'
+    )
+
+
+def test_post_card_version_changes(
+    mixer, user_client, many_posts_with_published_locations
+):
+    page_obj = user_client.get('/').context['page_obj']
+    post = page_obj[0]
+    post.title = 'Новый заголовок'
+    post.save()
+    mixer.blend('blog.Comment', post=page_obj[1])
+
+    response = user_client.get('/')
+    assert fragment_stats(response)['misses'] == 2
+    assert 'Новый заголовок' in response.content.decode()
+
+
+def test_username_change_refreshes_cards_and_feeds(
+    client, user, user_client, post_with_published_location,
+    published_category,
+):
+    old_username = user.username
+    urls = ['/', f'/category/{published_category.slug}/']
+    for url in urls + [f'/profile/{old_username}/']:
+        client.get(url)
+    user_client.get('/')
+    user_client.post('/edit_profile/', {
+        'username': 'renamed', 'first_name': '', 'last_name': '',
+        'email': user.email,
+    })
+    for response in [client.get(url) for url in urls] + [
+        user_client.get('/')
+    ]:
+        content = response.content.decode()
+        assert '@renamed' in content and f'@{old_username}' not in content, (
+            'Убедитесь, что после смены имени пользователя карточки и ленты '
+            'показывают новое имя автора.'
+        )
+    assert client.get(f'/profile/{old_username}/').status_code == 404, (
+        'Убедитесь, что закешированная страница профиля под старым именем '
+        'сбрасывается.'
+    )
@@ -0,0 +1,73 @@
+from io import BytesIO, StringIO
+
+import pytest
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+
+from blog.images import apply_renditions, build_renditions, rendition_name
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def post_with_large_image(mixer, media_root, post_with_published_location):
+    buffer = BytesIO()
+    Image.new('RGB', (1600, 900), 'teal').save(buffer, 'JPEG')
+    post = post_with_published_location
+    post.image = SimpleUploadedFile('photo.jpg', buffer.getvalue())
+    post.save()
+    return post
+
+
+def test_renditions_are_scheduled_after_commit(
+    django_capture_on_commit_callbacks, media_root, post_with_large_image
+):
+    post = post_with_large_image
+    post.image_renditions = {}
+    with django_capture_on_commit_callbacks() as callbacks:
+        post.save()
+    scheduled = [
+        callback for callback in callbacks
+        if 'schedule_renditions' in callback.__qualname__
+    ]
+    assert len(scheduled) == 1, (
+        'Убедитесь, что обработка фото ставится в очередь после коммита.'
+    )
+
+
+def test_renditions_in_srcset(client, media_root, post_with_large_image):
+    post = post_with_large_image
+    apply_renditions(post.pk, build_renditions(post.image.name))
+    for width in (640, 1200, 1280):
+        for ext in ('webp', 'jpg'):
+            assert (media_root / rendition_name(
+                post.image.name, width, ext
+            )).exists()
+    widest = media_root / rendition_name(post.image.name, 2400, 'jpg')
+    assert not widest.exists(), (
+        'Убедитесь, что копии шире оригинала не строятся.'
+    )
+
+    content = client.get('/').content.decode()
+    assert rendition_name(post.image.name, 640, 'webp') in content
+    assert 'sizes="(max-width: 640px) 100vw, 640px"' in content, (
+        'Убедитесь, что карточка ленты отдаёт srcset с размерами карточки.'
+    )
+    content = client.get(f'/posts/{post.id}/').content.decode()
+    assert rendition_name(post.image.name, 1200, 'jpg') in content
+
+
+def test_build_image_renditions_command(media_root, post_with_large_image):
+    call_command(
+        'build_image_renditions', workers=1, stdout=StringIO()
+    )
+    post = Post.objects.get(pk=post_with_large_image.pk)
+    assert post.image_renditions['widths'] == [640, 1200, 1280]
@@ -0,0 +1,60 @@
+import pytest
+
+HASHED = 'posts_images/ab/cd/' + 'abcd' * 16 + '.jpg'
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    for name in (HASHED, 'posts_images/legacy.jpg'):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(CONTENT)
+    return tmp_path
+
+
+def body(response):
+    return b''.join(response.streaming_content)
+
+
+def test_hashed_media_is_immutable(client, media_root):
+    response = client.get(f'/media/{HASHED}')
+    assert response.status_code == 200
+    assert body(response) == CONTENT
+    assert 'immutable' in response['Cache-Control'], (
+        'Убедитесь, что файлы с хешем в имени кешируются навсегда.'
+    )
+    response = client.get('/media/posts_images/legacy.jpg')
+    assert 'immutable' not in response['Cache-Control']
+
+
+def test_media_range_and_etag(client, media_root):
+    response = client.get(f'/media/{HASHED}', HTTP_RANGE='bytes=10-19')
+    assert response.status_code == 206
+    assert response['Content-Range'] == f'bytes 10-19/{len(CONTENT)}'
+    assert body(response) == CONTENT[10:20], (
+        'Убедитесь, что запрос Range отдаёт только нужные байты.'
+    )
+    response = client.get(f'/media/{HASHED}', HTTP_RANGE='bytes=-5')
+    assert body(response) == CONTENT[-5:]
+    response = client.get(
+        f'/media/{HASHED}', HTTP_RANGE=f'bytes={len(CONTENT)}-'
+    )
+    assert response.status_code == 416
+
+    etag = client.get(f'/media/{HASHED}')['ETag']
+    response = client.get(f'/media/{HASHED}', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+
+def test_media_offload(client, media_root, settings):
+    settings.MEDIA_SERVING = 'x-accel-redirect'
+    response = client.get(f'/media/{HASHED}')
+    assert response['X-Accel-Redirect'] == f'/protected-media/{HASHED}'
+    assert not response.content
+
+
+def test_media_rejects_traversal(client, media_root):
+    assert client.get('/media/../settings.py').status_code == 404
+    assert client.get('/media/posts_images/missing.jpg').status_code == 404
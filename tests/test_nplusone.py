@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.template import Context, Template
+from django.urls import reverse
+from django.utils import timezone
+
+from blog import urls as blog_urls
+from blogicum.nplusone import NPlusOneDetector
+
+pytestmark = [pytest.mark.django_db]
+
+N_OBJECTS = 5
+
+
+@pytest.fixture
+def route_data(mixer, user, published_category):
+    now = timezone.now()
+    authors = [user] + mixer.cycle(N_OBJECTS - 1).blend('auth.User')
+    posts = mixer.cycle(N_OBJECTS).blend(
+        'blog.Post',
+        author=(author for author in authors),
+        category=(
+            mixer.blend('blog.Category', is_published=True)
+            for _ in range(N_OBJECTS)
+        ),
+        location__is_published=True,
+        pub_date=(now - timedelta(hours=hour) for hour in range(N_OBJECTS)),
+    )
+    post = posts[0]
+    mixer.cycle(N_OBJECTS).blend(
+        'blog.Comment', post=post, author=(author for author in authors)
+    )
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    return {
+        'post_id': post.pk,
+        'comment_id': comment.pk,
+        'category_slug': post.category.slug,
+        'username': user.username,
+    }
+
+
+def blog_routes():
+    return [
+        (f'{blog_urls.app_name}:{pattern.name}',
+         list(pattern.pattern.converters))
+        for pattern in blog_urls.urlpatterns
+    ]
+
+
+@pytest.mark.parametrize('name, params', blog_routes())
+def test_blog_routes_have_no_n_plus_one(
+    user_client, route_data, name, params
+):
+    url = reverse(name, kwargs={param: route_data[param] for param in params})
+    data = {'q': 'a'} if name == 'blog:search' else None
+    # Автозапускаемая фикстура включает NPLUSONE_DETECTION = 'raise':
+    # страница с N+1 падает с NPlusOneError.
+    response = user_client.get(url, data)
+    assert response.status_code < 500
+
+
+def test_detector_reports_template_line(mixer, published_category):
+    mixer.cycle(N_OBJECTS).blend('blog.Post', category=published_category)
+    template = Template(
+        '{% for post in posts %}\n{{ post.author.username }}{% endfor %}'
+    )
+    detector = NPlusOneDetector(threshold=2)
+    with connection.execute_wrapper(detector):
+        template.render(Context({'posts': list(
+            published_category.posts.all()
+        )}))
+    problems = detector.problems()
+    assert len(problems) == 1, (
+        'Убедитесь, что детектор находит загрузку автора в цикле шаблона.'
+    )
+    count, sql, template_line, code = problems[0]
+    assert count == N_OBJECTS
+    assert 'auth_user' in sql
+    assert template_line.endswith(':2'), (
+        'Убедитесь, что детектор указывает строку шаблона, откуда пришли '
+        'запросы.'
+    )
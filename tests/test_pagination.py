@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.models import Post
+from blog.paginators import KeysetPaginator, encode_cursor
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+KEYSET_FEEDS = {
+    'index': 'keyset',
+    'category_posts': 'keyset',
+    'profile': 'keyset',
+}
+
+
+@pytest.fixture
+def keyset_posts(mixer, user, published_category):
+    now = timezone.now()
+    # Часть постов делит одну дату публикации, чтобы проверить
+    # разрешение ничьих по id на границах страниц.
+    dates = [now - timedelta(hours=i // 3) for i in range(N_PER_PAGE * 2 + 5)]
+    return mixer.cycle(len(dates)).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=(date for date in dates),
+    )
+
+
+def expected_order(posts):
+    return [
+        post.id for post in sorted(
+            posts, key=lambda post: (post.pub_date, post.id), reverse=True
+        )
+    ]
+
+
+def test_keyset_paginator_walks_forward_and_back(keyset_posts):
+    paginator = KeysetPaginator(Post.objects.all(), N_PER_PAGE)
+    pages = [paginator.get_page()]
+    while pages[-1].has_next():
+        pages.append(paginator.get_page(after=pages[-1].next_cursor))
+    walked = [post.id for page in pages for post in page]
+    assert walked == expected_order(keyset_posts), (
+        'Убедитесь, что курсорная пагинация обходит все посты по порядку '
+        'без пропусков и повторов.'
+    )
+    assert not pages[0].has_previous()
+
+    back = paginator.get_page(before=pages[-1].previous_cursor)
+    assert [post.id for post in back] == [post.id for post in pages[-2]], (
+        'Убедитесь, что курсор `before` возвращает предыдущую страницу.'
+    )
+
+
+@pytest.mark.parametrize('cursor', [
+    'not-a-cursor',
+    encode_cursor([1, 1]),
+    encode_cursor([[1], 'id']),
+    encode_cursor([None, 1]),
+])
+def test_keyset_paginator_ignores_broken_cursor(keyset_posts, cursor):
+    paginator = KeysetPaginator(Post.objects.all(), N_PER_PAGE)
+    for page in (
+        paginator.get_page(after=cursor), paginator.get_page(before=cursor)
+    ):
+        assert [post.id for post in page] == expected_order(keyset_posts)[
+            :N_PER_PAGE
+        ], (
+            'Убедитесь, что курсор со значениями не тех типов открывает '
+            'первую страницу.'
+        )
+
+
+@override_settings(FEED_PAGINATION=KEYSET_FEEDS)
+@pytest.mark.parametrize('url', ['/', '/category/{slug}/', '/profile/{user}/'])
+def test_feeds_in_keyset_mode(client, keyset_posts, user, published_category,
+                              url):
+    url = url.format(slug=published_category.slug, user=user.username)
+    response = client.get(url)
+    page_obj = response.context['page_obj']
+    assert len(page_obj) == N_PER_PAGE
+    assert f'?after={page_obj.next_cursor}' in response.content.decode()
+    seen = [post.id for post in page_obj]
+    while page_obj.has_next():
+        response = client.get(url, {'after': page_obj.next_cursor})
+        page_obj = response.context['page_obj']
+        seen.extend(post.id for post in page_obj)
+    assert seen == expected_order(keyset_posts)
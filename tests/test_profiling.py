@@ -0,0 +1,45 @@
+import logging
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def request_profiling(settings):
+    # По умолчанию профилирование включено только при DEBUG.
+    settings.REQUEST_PROFILING = True
+
+
+def timings(response):
+    return {
+        entry.split(';')[0]: entry
+        for entry in response['Server-Timing'].split(', ')
+    }
+
+
+def test_server_timing_header(client, post_with_published_location):
+    entries = timings(client.get('/'))
+    assert {'db', 'tpl', 'page_cache', 'total'} <= set(entries), (
+        'Убедитесь, что в Server-Timing есть время базы, шаблонов, '
+        'кеша страниц и всего запроса.'
+    )
+    assert 'queries' in entries['db']
+    entries = timings(client.get('/'))
+    assert 'hits=1' in entries['page_cache']
+
+
+def test_slow_request_is_logged(
+    settings, caplog, client, post_with_published_location
+):
+    settings.SLOW_REQUEST_THRESHOLD_MS = 0
+    with caplog.at_level(logging.WARNING, logger='blogicum.requests'):
+        client.get(f'/posts/{post_with_published_location.id}/')
+    assert any(
+        'SELECT' in record.getMessage() for record in caplog.records
+    ), 'Убедитесь, что в журнал медленных запросов попадают SQL-запросы.'
+
+
+def test_profiling_can_be_disabled(settings, client):
+    settings.REQUEST_PROFILING = False
+    assert 'Server-Timing' not in client.get('/')
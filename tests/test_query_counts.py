@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+def test_post_detail_queries_do_not_grow_with_comments(
+    mixer, client, post_with_published_location
+):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    mixer.cycle(2).blend('blog.Comment', post=post)
+    few = count_queries(client, url)
+    mixer.cycle(N_PER_PAGE * 3).blend('blog.Comment', post=post)
+    many = count_queries(client, url)
+    # Валидатор ETag, пост со связями и страница комментариев по курсору.
+    assert few == many == 3, (
+        'Убедитесь, что страница поста загружает пост, его автора, '
+        'категорию и место одним запросом, а комментарии — постранично '
+        f'вместе с авторами (запросов: {few} и {many}).'
+    )
+
+
+def test_post_detail_paginates_comments(
+    mixer, client, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(N_PER_PAGE + 3).blend('blog.Comment', post=post)
+    response = client.get(f'/posts/{post.id}/')
+    comments = response.context['comments']
+    assert len(comments) == N_PER_PAGE
+    response = client.get(
+        f'/posts/{post.id}/', {'after': comments.next_cursor}
+    )
+    assert len(response.context['comments']) == 3
+
+
+@pytest.mark.parametrize('logged_in', [False, True])
+def test_profile_queries_do_not_grow_with_posts(
+    mixer, client, user_client, user, published_category, logged_in
+):
+    url = f'/profile/{user.username}/'
+    viewer = user_client if logged_in else client
+    mixer.cycle(2).blend(
+        'blog.Post', author=user, category=published_category
+    )
+    few = count_queries(viewer, url)
+    mixer.cycle(N_PER_PAGE).blend(
+        'blog.Post', author=user, category=published_category,
+        location__is_published=True,
+    )
+    many = count_queries(viewer, url)
+    assert few == many, (
+        'Убедитесь, что лента профиля загружает категории, места и авторов '
+        f'постов тем же запросом (запросов: {few} и {many}).'
+    )
+
+
+def test_profile_hides_drafts_from_other_users(
+    mixer, another_user_client, user, published_category
+):
+    visible, draft = mixer.cycle(2).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=(flag for flag in (True, False)),
+    )
+    response = another_user_client.get(f'/profile/{user.username}/')
+    assert list(response.context['page_obj']) == [visible], (
+        'Убедитесь, что в чужом профиле видны только опубликованные посты.'
+    )
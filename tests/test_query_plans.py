@@ -0,0 +1,92 @@
+import re
+
+import pytest
+from django.db import connection
+
+from blog.models import Post
+from blog.paginators import COMMENT_ORDERING, KeysetPaginator
+from blog.views import get_posts
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite',
+        reason='Разбор плана написан под формат EXPLAIN QUERY PLAN SQLite.',
+    ),
+]
+
+FULL_SCAN = re.compile(r'\bSCAN (TABLE )?blog_post\b(?! USING)')
+
+
+def feed_querysets(user, category):
+    return {
+        'index': get_posts(Post.objects).order_by('-pub_date'),
+        'category': get_posts(Post.objects).filter(
+            category=category
+        ).order_by('-pub_date'),
+        'profile': Post.objects.for_profile(user, user),
+        'public_profile': Post.objects.for_profile(user),
+    }
+
+
+@pytest.mark.parametrize(
+    'feed', ['index', 'category', 'profile', 'public_profile']
+)
+def test_feed_query_uses_index(
+    feed, user, published_category, many_posts_with_published_locations
+):
+    plan = feed_querysets(user, published_category)[feed].explain()
+    assert 'blog_post' in plan and 'INDEX' in plan, (
+        f'Убедитесь, что запрос ленты `{feed}` использует индекс:\n{plan}'
+    )
+    assert not FULL_SCAN.search(plan), (
+        f'Запрос ленты `{feed}` полностью сканирует таблицу постов:\n{plan}'
+    )
+    assert 'TEMP B-TREE' not in plan, (
+        f'Запрос ленты `{feed}` сортирует посты вне индекса:\n{plan}'
+    )
+
+
+@pytest.mark.parametrize(
+    'feed', ['index', 'category', 'profile', 'public_profile']
+)
+@pytest.mark.parametrize('seek', [False, True])
+def test_keyset_feed_page_uses_index(
+    feed, seek, user, published_category,
+    many_posts_with_published_locations,
+):
+    queryset = feed_querysets(user, published_category)[feed]
+    paginator = KeysetPaginator(queryset, 10)
+    page = queryset.order_by(*paginator.ordering)
+    if seek:
+        post = many_posts_with_published_locations[0]
+        page = page.filter(
+            paginator._seek([post.pub_date, post.pk], forward=True)
+        )
+    plan = page.explain()
+    assert not FULL_SCAN.search(plan), (
+        f'Страница ленты `{feed}` полностью сканирует таблицу постов:\n'
+        f'{plan}'
+    )
+    assert 'TEMP B-TREE' not in plan, (
+        f'Страница ленты `{feed}` с порядком {paginator.ordering} '
+        f'сортируется вне индекса:\n{plan}'
+    )
+
+
+def test_comment_page_query_uses_index(mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(5).blend('blog.Comment', post=post)
+    paginator = KeysetPaginator(
+        post.comments.select_related('author'), 10, COMMENT_ORDERING
+    )
+    cursor = [comments[1].created_at, comments[1].pk]
+    plan = paginator.object_list.order_by(*COMMENT_ORDERING).filter(
+        paginator._seek(cursor, forward=True)
+    ).explain()
+    assert 'comment_post_created_idx' in plan, (
+        f'Убедитесь, что страница комментариев ищется по индексу:\n{plan}'
+    )
+    assert 'TEMP B-TREE' not in plan, (
+        f'Страница комментариев сортируется вне индекса:\n{plan}'
+    )
@@ -0,0 +1,92 @@
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from blogicum.replicas import LEAST_LOADED, PIN_COOKIE, ReplicaPool
+
+# Реплика в тестах — зеркало default со своим соединением: она видит
+# только закоммиченные данные.
+pytestmark = [
+    pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+]
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+
+
+def post_queries(client, url):
+    with CaptureQueriesContext(connections['default']) as primary:
+        with CaptureQueriesContext(connections['replica']) as replica:
+            assert client.get(url).status_code == 200
+    return tuple(
+        [query for query in context if 'FROM "blog_post"' in query['sql']]
+        for context in (primary, replica)
+    )
+
+
+def test_post_detail_reads_from_replica(
+    replicas, user_client, post_with_published_location
+):
+    url = f'/posts/{post_with_published_location.id}/'
+    primary, replica = post_queries(user_client, url)
+    assert replica and not primary, (
+        'Убедитесь, что страница поста читает посты с реплики.'
+    )
+
+
+def test_reads_are_pinned_after_write(
+    replicas, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    response = user_client.post(
+        f'/posts/{post.id}/comment/', {'text': 'Свой комментарий'}
+    )
+    assert PIN_COOKIE in response.cookies, (
+        'Убедитесь, что после комментария пользователь читает с основной '
+        'базы.'
+    )
+    primary, replica = post_queries(user_client, f'/posts/{post.id}/')
+    assert primary and not replica, (
+        'Убедитесь, что сразу после записи страница поста читается с '
+        'основной базы, а не с отстающей реплики.'
+    )
+
+
+def test_without_replicas_everything_reads_from_default(
+    user_client, post_with_published_location
+):
+    url = f'/posts/{post_with_published_location.id}/'
+    primary, replica = post_queries(user_client, url)
+    assert primary and not replica
+
+
+def test_replica_selection(settings):
+    aliases = ['first', 'second']
+    pool = ReplicaPool()
+    chosen = [pool.acquire(aliases) for _ in range(3)]
+    assert chosen == ['first', 'second', 'first']
+
+    settings.REPLICA_SELECTION = LEAST_LOADED
+    pool.release('first')
+    pool.release('first')
+    assert pool.acquire(aliases) == 'first', (
+        'Убедитесь, что при least-loaded выбирается реплика с наименьшим '
+        'числом открытых чтений.'
+    )
+
+
+@pytest.mark.parametrize('use_replicas, max_age', [(True, 10), (False, 300)])
+def test_feed_cache_from_replica_expires_with_lag(
+    settings, client, post_with_published_location, use_replicas, max_age
+):
+    settings.DATABASE_REPLICAS = ['replica'] if use_replicas else []
+    settings.REPLICA_PIN_SECONDS = 10
+    settings.FEED_CACHE_TIMEOUT = 300
+    response = client.get('/')
+    seconds = int(response['Cache-Control'].split('max-age=')[1])
+    assert max_age - 1 <= seconds <= max_age, (
+        'Убедитесь, что лента, прочитанная с отстающей реплики, кешируется '
+        'не дольше REPLICA_PIN_SECONDS.'
+    )
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.cache import INDEX, get_generation
+from blog.scheduler import PublicationScheduler, post_published
+
+pytestmark = [pytest.mark.django_db]
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = timezone.now()
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def published_events(clock):
+    events = []
+
+    def receiver(sender, post, **kwargs):
+        events.append((post.pk, clock()))
+
+    post_published.connect(receiver)
+    yield events
+    post_published.disconnect(receiver)
+
+
+def test_scheduler_fires_at_pub_date(
+    mixer, clock, published_category, published_events
+):
+    soon, later = mixer.cycle(2).blend(
+        'blog.Post',
+        category=published_category,
+        pub_date=(clock.now + timedelta(seconds=s) for s in (90, 200)),
+    )
+    scheduler = PublicationScheduler(
+        clock=clock, sleep=clock.sleep, max_sleep=3600
+    )
+    assert scheduler.seconds_until_next() == pytest.approx(90)
+
+    scheduler.run(iterations=3)
+    assert published_events == [
+        (soon.pk, soon.pub_date), (later.pk, later.pub_date)
+    ], (
+        'Убедитесь, что планировщик объявляет о выходе каждого поста '
+        'ровно в момент его pub_date.'
+    )
+
+
+def test_scheduler_caps_sleep_without_posts(clock):
+    scheduler = PublicationScheduler(clock=clock, max_sleep=60)
+    assert scheduler.seconds_until_next() == 60
+
+
+def test_published_post_purges_feed_cache(mixer, clock, published_category):
+    mixer.blend(
+        'blog.Post',
+        category=published_category,
+        pub_date=clock.now + timedelta(seconds=5),
+    )
+    scheduler = PublicationScheduler(clock=clock)
+    before = get_generation(INDEX)
+    clock.sleep(5)
+    scheduler.run_pending()
+    assert get_generation(INDEX) != before
+
+
+def test_feed_sets_max_age_until_next_publication(
+    mixer, client, published_category, post_with_published_location
+):
+    mixer.blend(
+        'blog.Post',
+        category=published_category,
+        pub_date=timezone.now() + timedelta(seconds=40),
+    )
+    response = client.get('/')
+    max_age = int(
+        response['Cache-Control'].split('max-age=')[1].split(',')[0]
+    )
+    assert 0 < max_age <= 40, (
+        'Убедитесь, что max-age ленты не превышает времени до ближайшей '
+        'отложенной публикации.'
+    )
@@ -0,0 +1,106 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from blog.models import Post
+from blog.paginators import encode_cursor
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='Проверяется путь FTS5.'
+    ),
+]
+
+
+@pytest.fixture
+def searchable_posts(mixer, user, published_category):
+    return [
+        mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            title=title, text=text,
+        )
+        for title, text in (
+            ('Кошки', 'Про кошек и котят <script>'),
+            ('Собаки', 'Про собак; кошки упомянуты один раз'),
+            ('Погода', 'Ничего интересного'),
+        )
+    ]
+
+
+def search(client, query, **params):
+    response = client.get('/search/', {'q': query, **params})
+    assert response.status_code == 200
+    return response
+
+
+def test_search_ranks_and_highlights(client, searchable_posts):
+    response = search(client, 'кошки')
+    titles = [post.title for post in response.context['page_obj']]
+    assert titles == ['Кошки', 'Собаки'], (
+        'Убедитесь, что поиск находит посты и ставит совпадение '
+        'в заголовке выше.'
+    )
+    content = response.content.decode()
+    assert '<mark>' in content
+    assert '<script>' not in content, 'Сниппеты должны экранироваться.'
+
+
+def test_search_skips_unpublished(client, searchable_posts):
+    Post.objects.filter(title='Кошки').update(is_published=False)
+    titles = [post.title for post in search(client, 'кошки').context[
+        'page_obj'
+    ]]
+    assert titles == ['Собаки']
+
+
+def test_search_index_follows_edits(client, searchable_posts):
+    post = searchable_posts[2]
+    post.text = 'Теперь здесь про хомяков'
+    post.save()
+    assert [p.id for p in search(client, 'хомяк').context['page_obj']] == [
+        post.id
+    ]
+    post.delete()
+    assert len(search(client, 'хомяк').context['page_obj']) == 0
+
+
+def test_search_keyset_pages(mixer, client, user, published_category):
+    mixer.cycle(15).blend(
+        'blog.Post', author=user, category=published_category,
+        text='одинаковый текст',
+    )
+    page_obj = search(client, 'одинаковый').context['page_obj']
+    seen = [post.id for post in page_obj]
+    assert page_obj.has_next()
+    page_obj = search(
+        client, 'одинаковый', after=page_obj.next_cursor
+    ).context['page_obj']
+    seen += [post.id for post in page_obj]
+    assert sorted(seen) == sorted(set(seen)) and len(seen) == 15
+
+
+@pytest.mark.parametrize('values', [[[1], 2], ['x', 2], [1.5, 'id']])
+def test_search_ignores_cursor_of_wrong_types(
+    client, searchable_posts, values
+):
+    response = search(client, 'кошки', after=encode_cursor(values))
+    assert len(response.context['page_obj']) == 2, (
+        'Убедитесь, что курсор поиска со значениями не тех типов открывает '
+        'первую страницу.'
+    )
+
+
+def test_search_tolerates_fts_syntax(client, searchable_posts):
+    search(client, '"кошки AND OR (')
+    search(client, '***')
+
+
+def test_rebuild_search_index(client, searchable_posts):
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM blog_post_fts')
+    assert len(search(client, 'кошки').context['page_obj']) == 0
+    call_command('rebuild_search_index', batch_size=2, stdout=StringIO())
+    assert len(search(client, 'кошки').context['page_obj']) == 2
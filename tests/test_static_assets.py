@@ -0,0 +1,46 @@
+import gzip
+
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def collected(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    call_command('collectstatic', interactive=False, verbosity=0)
+    return tmp_path
+
+
+def test_static_is_hashed_and_precompressed(client, collected):
+    name = staticfiles_storage.stored_name('css/bootstrap.min.css')
+    assert name != 'css/bootstrap.min.css', (
+        'Убедитесь, что collectstatic пишет имена с хешем содержимого.'
+    )
+    assert (collected / f'{name}.gz').exists()
+
+    response = client.get(f'/static/{name}', HTTP_ACCEPT_ENCODING='gzip')
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['Content-Type'] == 'text/css'
+    assert 'Accept-Encoding' in response['Vary']
+    assert 'immutable' in response['Cache-Control']
+    original = (collected / name).read_bytes()
+    assert gzip.decompress(b''.join(response.streaming_content)) == original
+
+    response = client.get(f'/static/{name}')
+    assert 'Content-Encoding' not in response
+    assert b''.join(response.streaming_content) == original
+
+    content = client.get('/').content.decode()
+    assert f'/static/{name}' in content, (
+        'Убедитесь, что стили bootstrap подключаются из своей статики.'
+    )
+
+
+def test_static_url_without_manifest(client, settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    content = client.get('/').content.decode()
+    assert '/static/css/bootstrap.min.css' in content
+    assert 'cdn.jsdelivr.net' not in content
@@ -0,0 +1,103 @@
+from io import BytesIO, StringIO
+
+import pytest
+from PIL import Image
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+
+from blog.models import Post
+from blog.storage import post_image_storage, release_image
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.POST_IMAGE_RELEASE_GRACE = 0
+    return tmp_path
+
+
+def photo(color='teal', name='photo.png'):
+    buffer = BytesIO()
+    Image.new('RGB', (20, 20), color).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/png')
+
+
+def test_identical_uploads_share_one_file(
+    mixer, media_root, django_capture_on_commit_callbacks, published_category
+):
+    first, second = mixer.cycle(2).blend(
+        'blog.Post', category=published_category, image=None
+    )
+    for post in (first, second):
+        post.image = photo()
+        post.save()
+    assert first.image.name == second.image.name, (
+        'Убедитесь, что одинаковые фото сохраняются под одним именем.'
+    )
+    assert first.image.name.count('/') == 3
+    assert len(list(media_root.rglob('*.png'))) == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    assert post_image_storage.exists(second.image.name), (
+        'Убедитесь, что фото не удаляется, пока на него ссылается пост.'
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        second.image = photo('red')
+        second.save()
+    assert len(list(media_root.rglob('*.png'))) == 1
+
+
+def test_extension_spellings_share_one_file(
+    mixer, media_root, django_capture_on_commit_callbacks, published_category
+):
+    jpg, jpeg = mixer.cycle(2).blend(
+        'blog.Post', category=published_category,
+        image=(photo(name=name) for name in ('photo.jpg', 'photo.JPEG')),
+    )
+    assert jpg.image.name == jpeg.image.name, (
+        'Убедитесь, что расширение .jpeg приводится к .jpg в имени файла.'
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        jpg.delete()
+    assert post_image_storage.exists(jpeg.image.name), (
+        'Убедитесь, что фото не удаляется, пока на него ссылается пост.'
+    )
+
+
+def test_recently_reused_file_is_not_released(
+    settings, mixer, media_root, published_category
+):
+    settings.POST_IMAGE_RELEASE_GRACE = 60
+    post = mixer.blend(
+        'blog.Post', category=published_category, image=photo()
+    )
+    name = post.image.name
+    Post.objects.filter(pk=post.pk).update(image='')
+    # Параллельная загрузка тех же байтов, ещё не закоммиченная.
+    assert post_image_storage.save('posts_images/photo.png', photo()) == name
+    release_image(name)
+    assert post_image_storage.exists(name), (
+        'Убедитесь, что только что использованный файл не удаляется.'
+    )
+    release_image(name, grace=0)
+    assert not post_image_storage.exists(name)
+
+
+def test_collect_media_garbage(mixer, media_root, published_category):
+    post = mixer.blend(
+        'blog.Post', category=published_category, image=photo()
+    )
+    orphan = post_image_storage.save('posts_images/orphan.png', photo('red'))
+    rendition = orphan.replace('.png', '.640w.webp')
+    post_image_storage.save_derived(rendition, ContentFile(b'webp'))
+
+    call_command('collect_media_garbage', min_age=0, stdout=StringIO())
+    assert post_image_storage.exists(post.image.name)
+    assert not post_image_storage.exists(orphan)
+    assert not post_image_storage.exists(rendition), (
+        'Убедитесь, что вместе с фото удаляются и его копии.'
+    )
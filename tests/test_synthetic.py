@@ -0,0 +1,61 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+SCALE = {
+    'users': 30, 'categories': 4, 'locations': 5,
+    'posts': 120, 'comments': 400,
+}
+
+
+def generate(**options):
+    call_command(
+        'generate_blog_data', seed=7, batch_size=50, stdout=StringIO(),
+        **SCALE, **options,
+    )
+    return (
+        list(Post.objects.order_by('pk').values_list(
+            'title', 'author_id', 'category_id', 'is_published'
+        )),
+        list(Comment.objects.order_by('pk').values_list(
+            'text', 'post_id', 'author_id'
+        )),
+    )
+
+
+def clear():
+    for model in (get_user_model(), Category, Location):
+        model.objects.all().delete()
+
+
+def test_generation_is_reproducible():
+    first = generate(workers=1)
+    clear()
+    assert generate(workers=2) == first, (
+        'Убедитесь, что одинаковый seed даёт одинаковые данные, сколько бы '
+        'процессов ни писали тексты.'
+    )
+
+
+def test_generated_distributions():
+    generate(workers=1)
+    assert Post.objects.count() == SCALE['posts']
+    assert Comment.objects.count() == SCALE['comments']
+    assert Post.objects.filter(pub_date__gt=timezone.now()).exists(), (
+        'Убедитесь, что среди сгенерированных постов есть отложенные.'
+    )
+    counts = sorted(
+        Post.objects.values_list('comment_count', flat=True), reverse=True
+    )
+    assert sum(counts) == SCALE['comments']
+    assert counts[0] > 10 * counts[len(counts) // 2], (
+        'Убедитесь, что комментарии распределены неравномерно: у '
+        'популярных постов их намного больше, чем у типичного.'
+    )
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.models import Post
+from blog.timeline import visible_entries
+from blog.views import get_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+def index_ids(client, **params):
+    # Клиент с авторизацией: кеш страниц отдаёт ответ без контекста.
+    response = client.get('/', params)
+    return [post.id for post in response.context['page_obj']]
+
+
+def expected_ids():
+    return list(
+        get_posts(Post.objects).order_by('-pub_date', '-id')
+        .values_list('id', flat=True)
+    )
+
+
+@pytest.fixture
+def mixed_posts(mixer, user, published_category, another_category):
+    now = timezone.now()
+    visible = mixer.cycle(3).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        pub_date=(now - timedelta(hours=hours) for hours in (1, 2, 3)),
+    )
+    mixer.blend('blog.Post', author=user, category=published_category,
+                pub_date=now + timedelta(days=1))
+    mixer.blend('blog.Post', author=user, category=published_category,
+                is_published=False)
+    hidden = mixer.blend('blog.Post', author=user, category=another_category)
+    return visible, hidden
+
+
+@override_settings(MATERIALIZED_TIMELINE=True)
+def test_timeline_matches_get_posts(
+    user_client, mixed_posts, another_category
+):
+    visible, hidden = mixed_posts
+    assert index_ids(user_client) == expected_ids(), (
+        'Убедитесь, что материализованная лента показывает те же посты, '
+        'что и get_posts.'
+    )
+
+    another_category.is_published = False
+    another_category.save()
+    visible[0].is_published = False
+    visible[0].save()
+    assert hidden.id not in index_ids(user_client)
+    assert index_ids(user_client) == expected_ids(), (
+        'Убедитесь, что лента учитывает снятие с публикации поста и '
+        'категории.'
+    )
+
+    another_category.is_published = True
+    another_category.save()
+    assert index_ids(user_client) == expected_ids()
+    another_category.delete()
+    assert index_ids(user_client) == expected_ids()
+
+
+@override_settings(
+    MATERIALIZED_TIMELINE=True, FEED_PAGINATION={'index': 'keyset'}
+)
+def test_timeline_keyset_pages(
+    user_client, many_posts_with_published_locations
+):
+    page_obj = user_client.get('/').context['page_obj']
+    first = [post.id for post in page_obj]
+    second = index_ids(user_client, after=page_obj.next_cursor)
+    assert first + second == expected_ids()
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='Разбор плана написан под формат EXPLAIN QUERY PLAN SQLite.',
+)
+def test_timeline_query_is_index_only(many_posts_with_published_locations):
+    plan = visible_entries().explain()
+    assert 'COVERING INDEX timeline_visible_idx' in plan, (
+        f'Убедитесь, что лента читается только из индекса:\n{plan}'
+    )
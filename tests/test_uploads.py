@@ -0,0 +1,94 @@
+import hashlib
+import posixpath
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+
+from blog.images import clean_image
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def image_file(size, name='photo.jpg', exif=None):
+    buffer = BytesIO()
+    image = Image.new('RGB', size, 'teal')
+    options = {'exif': exif} if exif is not None else {}
+    image.save(buffer, 'JPEG', **options)
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/jpeg')
+
+
+def post_data(published_category, image):
+    return {
+        'title': 'Фото',
+        'text': 'Текст',
+        'pub_date': timezone.now().strftime('%Y-%m-%dT%H:%M'),
+        'category': published_category.id,
+        'is_published': True,
+        'image': image,
+    }
+
+
+@pytest.mark.parametrize('limit, value', [
+    ('POST_IMAGE_MAX_PIXELS', 100 * 100),
+    ('POST_IMAGE_MAX_BYTES', 512),
+])
+def test_oversized_upload_is_rejected(
+    settings, user_client, published_category, limit, value
+):
+    setattr(settings, limit, value)
+    response = user_client.post(
+        '/posts/create/',
+        post_data(published_category, image_file((400, 300))),
+    )
+    assert response.status_code == 200
+    assert 'image' in response.context['form'].errors, (
+        'Убедитесь, что слишком большое фото отклоняется с ошибкой поля.'
+    )
+    assert not Post.objects.exists()
+
+
+def test_upload_within_limits_is_saved(
+    settings, tmp_path, user_client, published_category
+):
+    settings.MEDIA_ROOT = tmp_path
+    user_client.post(
+        '/posts/create/',
+        post_data(published_category, image_file((400, 300))),
+    )
+    assert Post.objects.get().image
+
+
+# Очистка идёт после коммита, а удаление старого файла — после коммита
+# уже её транзакции: нужны настоящие коммиты.
+@pytest.mark.django_db(transaction=True)
+def test_cleaned_upload_gets_its_own_hash(
+    settings, tmp_path, user_client, published_category
+):
+    settings.MEDIA_ROOT = tmp_path
+    settings.POST_IMAGE_MAX_WIDTH = 200
+    settings.POST_IMAGE_RELEASE_GRACE = 0
+    exif = Image.Exif()
+    exif[0x010F] = 'Камера'
+    user_client.post('/posts/create/', post_data(
+        published_category, image_file((400, 300), exif=exif.tobytes())
+    ))
+    image = Post.objects.get().image
+    content = image.read()
+    digest = posixpath.splitext(posixpath.basename(image.name))[0]
+    assert hashlib.sha256(content).hexdigest() == digest, (
+        'Убедитесь, что имя фото — хеш уже очищенного содержимого.'
+    )
+    with Image.open(BytesIO(content)) as stored:
+        assert stored.size == (200, 150)
+        assert not stored.getexif(), (
+            'Убедитесь, что из оригинала фото удаляются данные EXIF.'
+        )
+    assert clean_image(BytesIO(content)) is None
+    assert len(list(tmp_path.rglob('*.jpg'))) == 1, (
+        'Убедитесь, что неочищенный оригинал удаляется, когда пост '
+        'переходит на очищенный файл.'
+    )
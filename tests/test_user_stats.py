@@ -0,0 +1,107 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, UserStats
+
+pytestmark = [pytest.mark.django_db]
+
+
+def stats(user):
+    return UserStats.objects.values_list(
+        'post_count', 'comment_count'
+    ).get(pk=user.pk)
+
+
+def test_user_stats_follow_posts_and_comments(
+    mixer, user, published_category, post_with_published_location
+):
+    mixer.cycle(2).blend(
+        'blog.Post', author=user, category=published_category
+    )
+    mixer.cycle(3).blend(
+        'blog.Comment', author=user, post=post_with_published_location
+    )
+    assert stats(user) == (3, 3), (
+        'Убедитесь, что статистика пользователя растёт при создании постов '
+        'и комментариев.'
+    )
+    assert UserStats.objects.get(pk=user.pk).last_activity is not None
+
+    Comment.objects.filter(author=user).delete()
+    post_with_published_location.delete()
+    assert stats(user) == (2, 0), (
+        'Убедитесь, что статистика пользователя уменьшается при удалении.'
+    )
+
+
+@pytest.mark.parametrize('comments', [5, 50])
+def test_post_delete_uncounts_comments_at_once(
+    mixer, user, another_user, published_category, comments
+):
+    post, other_post = mixer.cycle(2).blend(
+        'blog.Post', author=user, category=published_category
+    )
+    mixer.cycle(comments).blend(
+        'blog.Comment', post=post,
+        author=(
+            (user, another_user)[number % 2] for number in range(comments)
+        ),
+    )
+    mixer.blend('blog.Comment', post=other_post, author=another_user)
+    with CaptureQueriesContext(connection) as context:
+        post.delete()
+    assert len(context.captured_queries) <= 10, (
+        'Убедитесь, что удаление поста не выполняет запросы на каждый его '
+        'комментарий.'
+    )
+    assert stats(user) == (1, 0)
+    assert stats(another_user) == (0, 1), (
+        'Убедитесь, что удаление поста снимает его комментарии со '
+        'статистики их авторов.'
+    )
+
+
+def test_recount_user_stats_command(mixer, user, another_user, comment):
+    UserStats.objects.all().delete()
+    mixer.blend('blog.Comment', author=user)
+    call_command('recount_user_stats', batch_size=1, stdout=StringIO())
+    assert stats(user)[1] == 1
+    assert UserStats.objects.filter(pk=another_user.pk).exists()
+
+
+def test_profile_loads_stats_with_user(
+    mixer, client, user, user_client, published_category
+):
+    mixer.cycle(2).blend(
+        'blog.Post', author=user, category=published_category
+    )
+    with CaptureQueriesContext(connection) as context:
+        response = user_client.get(f'/profile/{user.username}/')
+    separate = [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "blog_userstats"' in query['sql']
+    ]
+    assert not separate, (
+        'Убедитесь, что статистика загружается тем же запросом, что и '
+        f'пользователь, а не отдельно: {separate}'
+    )
+    assert 'Публикаций: 2' in response.content.decode()
+
+
+def test_post_count_is_shown_only_to_owner(
+    mixer, client, user, published_category
+):
+    mixer.blend('blog.Post', author=user, category=published_category)
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=False,
+    )
+    content = client.get(f'/profile/{user.username}/').content.decode()
+    assert 'Публикаций:' not in content, (
+        'Убедитесь, что счётчик постов с черновиками и отложенными постами '
+        'не показывается посетителям профиля.'
+    )